@@ -1,13 +1,56 @@
-import importlib
+import hashlib
+import importlib.util
+import os
 import os.path as osp
 
+# file_path -> (mtime_ns, size, sha256, module)
+_module_cache = {}
+
+
+def _file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
 def load(name):
-    file_path = osp.join(osp.dirname(__file__), name)
+    """
+    Import the agent file `name` (relative to this package), executing it only
+    once per process. The cached module is reused until the file's content
+    changes; a touched but identical file is not re-executed.
+    """
+    file_path = osp.abspath(osp.join(osp.dirname(__file__), name))
+    st = os.stat(file_path)
+    cached = _module_cache.get(file_path)
+    if cached is not None:
+        mtime_ns, size, digest, module = cached
+        if (mtime_ns, size) == (st.st_mtime_ns, st.st_size):
+            return module
+        new_digest = _file_hash(file_path)
+        if new_digest == digest:
+            _module_cache[file_path] = (st.st_mtime_ns, st.st_size, digest, module)
+            return module
+
+    digest = _file_hash(file_path)
     spec = importlib.util.spec_from_file_location(name, file_path)
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
+    _module_cache[file_path] = (st.st_mtime_ns, st.st_size, digest, module)
     return module
 
+
+def invalidate(name=None):
+    """
+    Drop the cached module for agent file `name`, or every cached module.
+    """
+    if name is None:
+        _module_cache.clear()
+        return
+    _module_cache.pop(osp.abspath(osp.join(osp.dirname(__file__), name)), None)
+
+
+def cached_modules():
+    return sorted(_module_cache)
+
 # def load(name):
 #     pathname = osp.join(osp.dirname(__file__), name)
 #     print(pathname)
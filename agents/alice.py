@@ -1,16 +1,15 @@
-import random
-import pickle
-import os
 import numpy as np
 
+from agents.instrumentation import phase
+from agents.demand_model import load_demand_model
+from agents.price_search import make_price_search, revenue_function
 
 '''
 This template serves as a starting point for your agent.
 '''
 
 
-picklefile = open('agents/dealmakers/8_xgb.pkl', 'rb')
-new_models = pickle.load(picklefile)
+demand = load_demand_model('xgb')
 
 class Agent(object):
     def __init__(self, agent_number, params={}):
@@ -22,6 +21,7 @@ class Agent(object):
         self.remaining_inventory = params['inventory_limit']
         self.inventory_replenish = params['inventory_replenish']
         self.PRICE_GRID = np.linspace(0.01, 500, 100)
+        self.price_search = make_price_search(params.get('price_search', 'grid'))
 
         self.inv_limit = params['inventory_limit']
         self.last_opponent_price = None
@@ -29,26 +29,8 @@ class Agent(object):
 
     
     def _calculate_expected_profit_vectorized(self, C1, C2, C3):
-        # thresholds
-        t1 = 2.7193025761078644
-        t2 = 2.7215555543935457
-        t3 = 7.262601783583493
-
-        # determine which model to use
-        key = (int(C1 > t1), int(C2 > t2), int(C3 > t3))
-        model = new_models[key]
-
-        # vectorized feature matrix: shape (100, 4)
-        # price_item first
-        X_batch = np.column_stack([
-            self.PRICE_GRID,
-            np.full_like(self.PRICE_GRID, C1),
-            np.full_like(self.PRICE_GRID, C2),
-            np.full_like(self.PRICE_GRID, C3),
-        ])
-
-    # one prediction call instead of 100
-        probs = model.predict_proba(X_batch)[:, 1]
+        # one prediction call instead of 100; the demand model picks the segment
+        probs = demand.predict_grid((C1, C2, C3), self.PRICE_GRID)
 
         # expected profit = price * prob
         return probs * self.PRICE_GRID
@@ -158,11 +140,12 @@ class Agent(object):
         C1, C2, C3 = new_buyer_covariates
 
         # 1. Base myopic optimal price
-        profit_array = self._calculate_expected_profit_vectorized(C1, C2, C3)
-        optimal_price = self.PRICE_GRID[np.argmax(profit_array)]
+        with phase("demand_model"):
+            optimal_price, _ = self.price_search.maximize(revenue_function(demand, C1, C2, C3))
 
         # 2. Dynamic multiplier
-        multiplier = self._calculate_price_multiplier(time_until_replenish)
+        with phase("multiplier"):
+            multiplier = self._calculate_price_multiplier(time_until_replenish)
 
         P_offer = optimal_price * multiplier
         return max(0.01, min(500, P_offer))
@@ -1,8 +1,9 @@
-import random
-import pickle
-import os
 import numpy as np
 
+from agents.instrumentation import phase
+from agents.demand_model import load_demand_model
+from agents.segments import segment_key
+from agents.shadow_prices import ShadowPrices
 """
 Improved DP-based dynamic pricing agent with:
 
@@ -13,8 +14,7 @@ Improved DP-based dynamic pricing agent with:
 Compatible with the Part 2 environment and 8_xgb.pkl segment models.
 """
 
-picklefile = open('agents/dealmakers/8_xgb.pkl', 'rb')
-new_models = pickle.load(picklefile)
+demand = load_demand_model('xgb')
 
 
 class Agent(object):
@@ -43,7 +43,7 @@ class Agent(object):
         self.last_outcome = None  # +1: we sold, -1: opp sold, 0: no sale
 
         # ---------------- DP parameters (tunable) ----------------
-        # base sale prob in simplified DP model
+        # sale prob in the simplified DP model until customers of a segment have been seen
         self.dp_base_p = 0.4
         # scale DP shadow value into price space (key knob to reduce leftover utility)
         self.dp_lambda_scale = 100.0
@@ -52,7 +52,10 @@ class Agent(object):
         # softness of logistic competition response
         self.competition_k = 1.0
 
-        # Precompute DP shadow table once
+        # DP shadow table, rebuilt at every replenishment from observed demand
+        self.shadow = ShadowPrices(self.PRICE_GRID, self.dp_base_p)
+        self.cycle_limit = self.inv_limit
+        self.last_time_until_replenish = None
         self._precompute_dp_shadow_table()
 
 
@@ -65,43 +68,30 @@ class Agent(object):
     # ============================================================
     def _precompute_dp_shadow_table(self):
         """
-        Precompute a DP value function V[i, k] and shadow values lambda_dp[i, k]:
+        DP value function V_dp[i, k] and shadow values lambda_dp[i, k] of the
+        simplified single-seller DP (agents.shadow_prices), for the customer mix:
 
-        i = 0..inv_limit          (inventory)
-        k = 0..inventory_replenish (customers left in cycle)
+        i = 0..cycle_limit          (inventory)
+        k = 0..inventory_replenish  (customers left in cycle)
 
-        Simplified single-seller DP:
           - Each step: can "offer" or "hold".
           - If offer: sell w.p. p, reward=1, then V[i-1,k-1]; else V[i,k-1].
           - If hold: V[i,k-1].
-        """
-        I_max = self.inv_limit
-        T_max = self.inventory_replenish
-        p = self.dp_base_p
-
-        V = np.zeros((I_max + 1, T_max + 1), dtype=float)
-
-        # DP recursion
-        for k in range(1, T_max + 1):          # customers left
-            for i in range(1, I_max + 1):      # inventory
-                offer_value = p * (1.0 + V[i - 1, k - 1]) + (1.0 - p) * V[i, k - 1]
-                hold_value = V[i, k - 1]
-                V[i, k] = max(offer_value, hold_value)
-
-        lambdas = np.zeros_like(V)
-        for i in range(1, I_max + 1):
-            lambdas[i, :] = V[i, :] - V[i - 1, :]
 
-        self.V_dp = V
-        self.lambda_dp = lambdas
+        p is the sale probability at the optimal price of the customers seen
+        so far (dp_base_p before any), averaged over the segment mix. The
+        per-segment tables are filled alongside and priced from in
+        _get_shadow_price.
+        """
+        self.V_dp, self.lambda_dp = self.shadow.tables(self.cycle_limit, self.inventory_replenish)
 
-    def _get_shadow_price(self, inventory, time_until_replenish):
+    def _get_shadow_price(self, inventory, time_until_replenish, segment=None):
         """
-        Shadow price = scaled marginal value of one more unit of inventory at (i, k).
+        Shadow price = scaled marginal value of one more unit of inventory at (i, k),
+        from the DP of the customer's segment (None: the customer mix).
         """
-        i = int(max(0, min(inventory, self.inv_limit)))
-        k = int(max(0, min(time_until_replenish, self.inventory_replenish)))
-        base_lambda = self.lambda_dp[i, k]
+        base_lambda = self.shadow.shadow_price(
+            inventory, time_until_replenish, self.cycle_limit, self.inventory_replenish, segment)
         return self.dp_lambda_scale * base_lambda
 
     # ============================================================
@@ -112,21 +102,8 @@ class Agent(object):
         Compute solo purchase probabilities across PRICE_GRID using the correct
         XGBoost segment model. Return (expected_profit, solo_probs).
         """
-        # Segment thresholds (same as your Part 1)
-        t1, t2, t3 = 2.7193025761078644, 2.7215555543935457, 7.262601783583493
-
-        key = (int(C1 > t1), int(C2 > t2), int(C3 > t3))
-        model = new_models[key]
-
         prices = self.PRICE_GRID
-        X_batch = np.column_stack([
-            prices,
-            np.full_like(prices, C1),
-            np.full_like(prices, C2),
-            np.full_like(prices, C3),
-        ])
-
-        probs = model.predict_proba(X_batch)[:, 1]  # P(buy | price, covariates)
+        probs = demand.predict_grid((C1, C2, C3), prices)  # P(buy | price, covariates)
         expected_profit = probs * prices
         return expected_profit, probs
 
@@ -236,20 +213,32 @@ class Agent(object):
         # Update internal state
         self._process_last_sale(last_sale, state, inventories, time_until_replenish)
 
+        # New replenishment cycle: refresh the DP shadow table for its inventory limit
+        if self.last_time_until_replenish is None or time_until_replenish > self.last_time_until_replenish:
+            with phase("dp_rebuild"):
+                self.cycle_limit = int(self.remaining_inventory)
+                self.shadow.refresh()
+                self._precompute_dp_shadow_table()
+        self.last_time_until_replenish = time_until_replenish
+
         # If out of inventory, effectively don't sell
         if self.remaining_inventory <= 0:
             return 1000.0
 
         C1, C2, C3 = new_buyer_covariates
+        segment = segment_key(C1, C2, C3)
 
         # 1) Solo demand across price grid
-        _, solo_probs = self._calculate_expected_profit_vectorized(C1, C2, C3)
+        with phase("demand_model"):
+            _, solo_probs = self._calculate_expected_profit_vectorized(C1, C2, C3)
+        self.shadow.observe(segment, solo_probs)
 
         # 2) Competition-adjusted effective probabilities
         eff_probs = self._compute_effective_probs_with_competition(solo_probs)
 
         # 3) DP shadow price for current (inventory, time)
-        shadow_price = self._get_shadow_price(self.remaining_inventory, time_until_replenish)
+        with phase("dp_lookup"):
+            shadow_price = self._get_shadow_price(self.remaining_inventory, time_until_replenish, segment)
 
         # 4) DP-adjusted profit objective: eff_probs * (price - shadow_price)
         margins = self.PRICE_GRID - shadow_price
@@ -1,13 +1,9 @@
-import random
-import pickle
 import os
 import numpy as np
-import sys
 
-try:
-    import xgboost
-except ImportError:
-    pass 
+from agents.demand_model import load_demand_model_or_none
+from agents.model_registry import get_model
+from agents.segments import segment_key
 '''
 Unified Agent: Meta-Agent Strategy
 Integrates David (DP) and NewAgent (Inventory/Saturation Heuristic)
@@ -21,6 +17,7 @@ def load_pickle_safe(filename):
     """安全載入 Pickle，嘗試不同路徑組合"""
     paths_to_try = [
         os.path.join(BASE_DIR, filename),              
+        os.path.join(BASE_DIR, 'dealmakers', filename), 
         os.path.join('agents', 'dealmakers', filename), 
         os.path.join('dealmakers', filename),           
         filename                                      
@@ -28,18 +25,17 @@ def load_pickle_safe(filename):
     for p in paths_to_try:
         if os.path.exists(p):
             try:
-                with open(p, 'rb') as f:
-                    return pickle.load(f)
+                return get_model(os.path.abspath(p))
             except Exception as e:
                 print(f"Error loading {p}: {e}")
     return None
 
 
-MODELS_LOGREG = load_pickle_safe('8_models_dict.pkl')
+DEMAND_LOGREG = load_demand_model_or_none('logistic')
 DP_POLICY = load_pickle_safe('dp_policy.pkl')
 
 
-MODELS_XGB = load_pickle_safe('8_xgb.pkl')
+DEMAND_XGB = load_demand_model_or_none('xgb')
 
 
 
@@ -48,13 +44,9 @@ class DavidSubAgent(object):
         self.this_agent_number = agent_number
         self.remaining_inventory = params['inventory_limit']
         
-        self.models = MODELS_LOGREG
+        self.demand = DEMAND_LOGREG
         self.dp_policy = DP_POLICY
 
-        self.t1 = 2.7193025761078644
-        self.t2 = 2.7215555543935457
-        self.t3 = 7.262601783583493
-
         if self.dp_policy:
             self.seg_multipliers = {key: 1.0 for key in self.dp_policy.keys()}
             self.seg_sale_history = {key: [] for key in self.dp_policy.keys()}
@@ -117,10 +109,10 @@ class DavidSubAgent(object):
             return 999.0
 
         C1, C2, C3 = new_buyer_covariates
-        seg_key = (C1 > self.t1, C2 > self.t2, C3 > self.t3)
+        seg_key = segment_key(C1, C2, C3)
         self.last_seg_key = seg_key
 
-        if not self.models or seg_key not in self.models:
+        if self.demand is None or not self.demand.has_segment(seg_key):
             return 50.0
 
         I = int(self.remaining_inventory)
@@ -138,21 +130,13 @@ class DavidSubAgent(object):
         m = self.seg_multipliers.get(seg_key, 1.0)
         p_dp = p_dp * m
 
-        best_p = 100
-        best_rev = -1
-        model = self.models[seg_key]
-
-        for p_test in self.PRICE_GRID:
-            prob = model.predict_proba([[C1, C2, C3, p_test]])[0, 1]
-            rev = p_test * prob
-            if rev > best_rev:
-                best_rev = rev
-                best_p = p_test
+        rev_grid = self.PRICE_GRID * self.demand.predict_grid((C1, C2, C3), self.PRICE_GRID)
+        best_p = self.PRICE_GRID[int(np.argmax(rev_grid))]
 
         p_static = best_p * m
 
-        prob_dp = model.predict_proba([[C1, C2, C3, p_dp]])[0, 1]
-        prob_static = model.predict_proba([[C1, C2, C3, p_static]])[0, 1]
+        prob_dp = self.demand.predict_at(C1, C2, C3, p_dp)
+        prob_static = self.demand.predict_at(C1, C2, C3, p_static)
         
         rev_dp = p_dp * prob_dp
         rev_static = p_static * prob_static
@@ -183,24 +167,16 @@ class NewSubAgent(object):
         self.remaining_inventory = params['inventory_limit']
         self.opponent_inventory = params['inventory_limit']
         
-        self.models = MODELS_XGB
-        
-        self.t1 = 2.7193025761078644
-        self.t2 = 2.7215555543935457
-        self.t3 = 7.262601783583493
+        self.demand = DEMAND_XGB
         
         self.PRICE_GRID = np.linspace(0.01, 500, 100)
     
     def _calculate_expected_profit(self, P, C1, C2, C3):
-        key = (int(C1 > self.t1), int(C2 > self.t2), int(C3 > self.t3))
-        
-        if not self.models or key not in self.models:
+        if self.demand is None or not self.demand.has_segment(segment_key(C1, C2, C3)):
             return P * 0.5 
 
-        model = self.models[key]
-        X = [[P, C1, C2, C3]]
         try:
-            prob_buy = model.predict_proba(X)[0, 1]
+            prob_buy = self.demand.predict_at(C1, C2, C3, P)
         except:
             prob_buy = 0.5
 
@@ -244,12 +220,15 @@ class NewSubAgent(object):
         max_profit = -1.0
         optimal_price = 1000.0
 
-        if self.models:
-            for P_test in self.PRICE_GRID:
-                current_profit = self._calculate_expected_profit(P_test, C1, C2, C3)
-                if current_profit > max_profit:
-                    max_profit = current_profit
-                    optimal_price = P_test
+        if self.demand is not None:
+            if self.demand.has_segment(segment_key(C1, C2, C3)):
+                profits = self.PRICE_GRID * self.demand.predict_grid((C1, C2, C3), self.PRICE_GRID)
+            else:
+                profits = self.PRICE_GRID * 0.5
+            best = int(np.argmax(profits))
+            if profits[best] > max_profit:
+                max_profit = profits[best]
+                optimal_price = self.PRICE_GRID[best]
         else:
             optimal_price = 50.0
 
@@ -0,0 +1,227 @@
+"""
+Pickle-free model artifacts: plain .npy arrays plus a JSON manifest.
+
+Exporting reads a pickled model file once (this step needs xgboost/sklearn)
+and writes agents/dealmakers/artifacts/<model stem>/:
+
+  manifest.json
+      {"format": 1,
+       "kind": "tree_ensembles" | "logistic" | "policy_tables" | "linear",
+       "source": "8_xgb.pkl",
+       "source_sha256": "<hex digest of the pickle it was exported from>",
+       "loader": "agents.tree_ensemble:load_xgb_ensembles",
+       "arrays": {"<name>": {"file": "<name>.npy", "dtype": "<f4", "shape": [...]}, ...},
+       "meta": {...}}
+  <name>.npy
+      one array per file, NumPy's own .npy format (no pickled objects)
+
+Segment keys are written as "abc", e.g. (1, 0, 1) -> "101".
+
+  tree_ensembles  8_xgb.pkl: "<key>.<field>" for every field of
+                  TreeEnsemble.arrays(), the flattened perfect-layout trees;
+                  feature is stored as uint8 (the mask tables are rebuilt on load)
+  logistic        8_models_dict.pkl: "coef" (8, 5), rows [w_C1, w_C2, w_C3, w_P, b];
+                  meta.keys lists the segments that have a model
+  policy_tables   dp_policy.pkl: "<key>", one price table per segment
+  linear          trained_model: "coef" and "intercept" of the LinearRegression
+
+load_artifact() memory-maps every array and rebuilds what the pickle loader
+named in "loader" would have returned: {key: TreeEnsemble}, a
+LogisticEngine, {key: table} or a LinearModel. model_registry.get_model()
+uses a fresh artifact in place of the pickle, so the agents load without
+importing xgboost or sklearn:
+
+    python -m agents.artifacts                       # export every model file found
+    python -m agents.artifacts --models 8_xgb.pkl
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+
+from agents.logistic_engine import LogisticEngine
+from agents.model_registry import PACKAGE_DIR, digest, resolve
+from agents.segments import SEGMENT_KEYS
+from agents.tree_ensemble import TreeEnsemble, compile_models
+
+FORMAT_VERSION = 1
+ARTIFACT_DIR = os.path.join(PACKAGE_DIR, "dealmakers", "artifacts")
+MANIFEST = "manifest.json"
+MODEL_FILES = ["8_xgb.pkl", "8_models_dict.pkl", "dp_policy.pkl", "trained_model"]
+
+# the pickle loader whose result each kind reproduces
+LOADERS = {
+    "tree_ensembles": "agents.tree_ensemble:load_xgb_ensembles",
+    "logistic": "agents.logistic_engine:load_logistic_engine",
+    "policy_tables": "agents.model_registry:_load_pickle",
+    "linear": "agents.model_registry:_load_pickle",
+}
+
+
+class LinearModel(object):
+    """
+    predict() of a fitted sklearn linear regressor, from its coef_ and intercept_.
+    """
+    def __init__(self, coef, intercept):
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_.T + self.intercept_
+
+
+def key_name(key):
+    return "".join(str(int(v)) for v in key)
+
+
+def key_tuple(name):
+    return tuple(int(c) for c in name)
+
+
+def artifact_dir(name, base=ARTIFACT_DIR):
+    return os.path.join(base, os.path.splitext(os.path.basename(name))[0])
+
+
+def _kind(obj):
+    if isinstance(obj, dict):
+        values = list(obj.values())
+        if values and all(isinstance(v, np.ndarray) for v in values):
+            return "policy_tables"
+        if values and all(hasattr(v, "get_booster") for v in values):
+            return "tree_ensembles"
+        if values and all(hasattr(v, "coef_") for v in values):
+            return "logistic"
+    elif hasattr(obj, "coef_") and hasattr(obj, "intercept_"):
+        return "linear"
+    raise ValueError("no artifact format for {}".format(type(obj).__name__))
+
+
+def to_arrays(obj):
+    """
+    (kind, {array name: ndarray}, meta) for an unpickled model object.
+    """
+    kind = _kind(obj)
+    arrays, meta = {}, {}
+    if kind == "tree_ensembles":
+        for key, ensemble in compile_models(obj).items():
+            for field, array in ensemble.arrays().items():
+                if field == "feature":
+                    array = array.astype(np.min_scalar_type(max(int(array.max()), 0)))
+                arrays["{}.{}".format(key_name(key), field)] = array
+    elif kind == "logistic":
+        engine = LogisticEngine.from_models(obj)
+        arrays["coef"] = engine.coef
+        meta["keys"] = [key_name(key) for key in engine.keys]
+    elif kind == "policy_tables":
+        for key, table in obj.items():
+            arrays[key_name(key)] = table
+    else:
+        arrays["coef"] = np.asarray(obj.coef_)
+        arrays["intercept"] = np.asarray(obj.intercept_)
+    return kind, arrays, meta
+
+
+def export_model(name, base=ARTIFACT_DIR):
+    """
+    Export pickled model file `name` to its artifact directory under base;
+    returns that directory. The directory is replaced as a whole.
+    """
+    source = resolve(name)
+    with open(source, "rb") as f:
+        kind, arrays, meta = to_arrays(pickle.load(f))
+
+    out = artifact_dir(name, base)
+    tmp = out + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    entries = {}
+    for array_name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        filename = array_name + ".npy"
+        np.save(os.path.join(tmp, filename), array, allow_pickle=False)
+        entries[array_name] = {"file": filename, "dtype": array.dtype.str, "shape": list(array.shape)}
+    manifest = {
+        "format": FORMAT_VERSION,
+        "kind": kind,
+        "source": os.path.basename(source),
+        "source_sha256": digest(source),
+        "loader": LOADERS[kind],
+        "arrays": entries,
+        "meta": meta,
+    }
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    if os.path.isdir(out):
+        shutil.rmtree(out)
+    os.replace(tmp, out)
+    return out
+
+
+def read_manifest(path):
+    """
+    Manifest of artifact directory `path` (or of its manifest.json itself).
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST)
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError("unsupported artifact format {!r} in {}".format(manifest.get("format"), path))
+    return manifest
+
+
+def load_artifact(path):
+    """
+    Memory-mapped model from artifact directory `path` (or its manifest.json).
+    """
+    directory = os.path.dirname(path) if os.path.isfile(path) else path
+    manifest = read_manifest(directory)
+    arrays = {}
+    for array_name, entry in manifest["arrays"].items():
+        array = np.load(os.path.join(directory, entry["file"]), mmap_mode="r", allow_pickle=False)
+        if array.dtype.str != entry["dtype"] or list(array.shape) != entry["shape"]:
+            raise ValueError("{} does not match the manifest of {}".format(entry["file"], directory))
+        arrays[array_name] = array
+
+    kind = manifest["kind"]
+    if kind == "tree_ensembles":
+        fields = {}
+        for array_name, array in arrays.items():
+            key, field = array_name.split(".", 1)
+            fields.setdefault(key_tuple(key), {})[field] = array
+        return {key: TreeEnsemble.from_arrays(fields[key]) for key in SEGMENT_KEYS if key in fields}
+    if kind == "logistic":
+        return LogisticEngine(arrays["coef"], [key_tuple(key) for key in manifest["meta"]["keys"]])
+    if kind == "policy_tables":
+        return {key_tuple(key): table for key, table in arrays.items()}
+    if kind == "linear":
+        return LinearModel(arrays["coef"], arrays["intercept"])
+    raise ValueError("unknown artifact kind {!r}".format(kind))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the pickled models to pickle-free artifacts.")
+    parser.add_argument("--models", nargs="*", default=MODEL_FILES)
+    parser.add_argument("--out_dir", default=ARTIFACT_DIR)
+    args = parser.parse_args(argv)
+
+    for name in args.models:
+        try:
+            source = resolve(name)
+        except FileNotFoundError:
+            print("{}: not found, skipped".format(name))
+            continue
+        out = export_model(name, args.out_dir)
+        start = time.perf_counter()
+        load_artifact(out)
+        print("{} -> {} ({:.1f} MB pickle, loads in {:.1f} ms)".format(
+            name, out, os.path.getsize(source) / 2.0 ** 20, 1e3 * (time.perf_counter() - start)))
+
+
+if __name__ == "__main__":
+    main()
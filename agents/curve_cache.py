@@ -0,0 +1,150 @@
+"""
+Memory-bounded cache of fixed-width float rows (demand curves, single probabilities).
+
+All values live in one preallocated slab[capacity, width]. Keys (bytes or
+tuples) go in an open-addressing table: linear probing, with backward-shift
+deletion so no tombstones pile up. When the slab is full, a CLOCK hand
+(second-chance approximation of LRU) picks the row to reuse. Capacity comes
+from a byte budget that covers the slab and an estimate of the per-entry key
+overhead.
+
+get() returns a zero-copy, read-only view into the slab. The view stays
+valid until the next put() (which may evict and overwrite that row), so use
+it or copy it straight away:
+
+    cache = CurveCache(width=PRICE_GRID.size, budget_bytes=32 << 20)
+    curve = cache.get(key)
+    if curve is None:
+        curve = cache.put(key, model_curve(...))
+"""
+import numpy as np
+
+# estimated Python-side bytes per entry: the key object, its hash, table slots
+ENTRY_OVERHEAD = 128
+EMPTY = -1
+
+
+class CurveCache(object):
+    def __init__(self, width, budget_bytes=32 << 20, dtype=np.float32):
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        row_bytes = width * self.dtype.itemsize + ENTRY_OVERHEAD
+        self.capacity = max(1, int(budget_bytes) // row_bytes)
+        self.budget_bytes = budget_bytes
+
+        self.slab = np.zeros((self.capacity, width), dtype=self.dtype)
+        self._view = self.slab.view()
+        self._view.flags.writeable = False
+
+        # key table: at most half full, so probe chains stay short
+        n_slots = 1
+        while n_slots < 2 * self.capacity:
+            n_slots *= 2
+        self._mask = n_slots - 1
+        self._slots = [EMPTY] * n_slots
+        # per slab row
+        self._keys = [None] * self.capacity
+        self._hashes = [0] * self.capacity
+        self._slot_of = [EMPTY] * self.capacity
+        self._referenced = bytearray(self.capacity)
+
+        self.size = 0
+        self.hand = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self.size
+
+    def _find(self, key, h):
+        slots, keys, mask = self._slots, self._keys, self._mask
+        i = h & mask
+        while True:
+            row = slots[i]
+            if row == EMPTY:
+                return EMPTY, i
+            if keys[row] == key:
+                return row, i
+            i = (i + 1) & mask
+
+    def get(self, key):
+        row, _ = self._find(key, hash(key))
+        if row == EMPTY:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._referenced[row] = 1
+        return self._view[row]
+
+    def _remove_slot(self, i):
+        # backward-shift deletion: pull later chain members into the hole
+        slots, hashes, slot_of, mask = self._slots, self._hashes, self._slot_of, self._mask
+        slots[i] = EMPTY
+        j = i
+        while True:
+            j = (j + 1) & mask
+            row = slots[j]
+            if row == EMPTY:
+                return
+            home = hashes[row] & mask
+            # the entry at j may move to i unless its home lies cyclically in (i, j]
+            if (i < j and i < home <= j) or (j < i and (home > i or home <= j)):
+                continue
+            slots[i] = row
+            slot_of[row] = i
+            slots[j] = EMPTY
+            i = j
+
+    def _evict(self):
+        referenced = self._referenced
+        while referenced[self.hand]:
+            referenced[self.hand] = 0
+            self.hand = (self.hand + 1) % self.capacity
+        row = self.hand
+        self.hand = (self.hand + 1) % self.capacity
+        self._remove_slot(self._slot_of[row])
+        self._keys[row] = None
+        self.evictions += 1
+        return row
+
+    def put(self, key, values):
+        """
+        Store values (width numbers) under key; returns the read-only view of the stored row.
+        """
+        h = hash(key)
+        row, slot = self._find(key, h)
+        if row == EMPTY:
+            if self.size < self.capacity:
+                row = self.size
+                self.size += 1
+            else:
+                row = self._evict()
+                # eviction may have shifted the chain this key probes
+                _, slot = self._find(key, h)
+            self._slots[slot] = row
+            self._slot_of[row] = slot
+            self._keys[row] = key
+            self._hashes[row] = h
+        self.slab[row] = values
+        self._referenced[row] = 1
+        return self._view[row]
+
+    def clear(self):
+        self._slots = [EMPTY] * (self._mask + 1)
+        self._keys = [None] * self.capacity
+        self._slot_of = [EMPTY] * self.capacity
+        self._referenced = bytearray(self.capacity)
+        self.size = 0
+        self.hand = 0
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "capacity": self.capacity,
+            "slab_bytes": self.slab.nbytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,8 +1,8 @@
-import random
-import pickle
-import os
 import numpy as np
 
+from agents.demand_model import load_demand_model
+from agents.model_registry import get_model
+from agents.segments import segment_key
 
 '''
 This template serves as a starting point for your agent.
@@ -34,15 +34,8 @@ class Agent(object):
         ### and you want to keep track of the opponent's status
         # self.opponent_number = 1 - agent_number  # index for opponent
 
-        self.t1 = 2.7193025761078644
-        self.t2 = 2.7215555543935457
-        self.t3 = 7.262601783583493
-
-        with open('agents/dealmakers/8_models_dict.pkl', 'rb') as f:
-            self.models = pickle.load(f)
-
-        with open('agents/dealmakers/dp_policy.pkl', 'rb') as f:
-            self.dp_policy = pickle.load(f)
+        self.demand = load_demand_model('logistic')
+        self.dp_policy = get_model('dp_policy.pkl')
 
         self.seg_multipliers = {key: 1.0 for key in self.dp_policy.keys()}
         self.seg_sale_history = {key: [] for key in self.dp_policy.keys()}
@@ -57,8 +50,7 @@ class Agent(object):
         self.PRICE_GRID = np.linspace(0.01, 500, 100)
 
     def _calculate_expected_profit(self, P, C1, C2, C3, seg_key):
-        model = self.models[seg_key]
-        prob = model.predict_proba([[C1, C2, C3, P]])[0, 1]
+        prob = self.demand.predict_at(C1, C2, C3, P)
         return P * prob
 
     def _calculate_price_multiplier(self, T, I):
@@ -166,7 +158,7 @@ class Agent(object):
         ### combined with models you come up with using the training data 
         ### and history of prices from each team to set a better price for the item
         C1, C2, C3 = new_buyer_covariates
-        seg_key = (C1 > self.t1, C2 > self.t2, C3 > self.t3)
+        seg_key = segment_key(C1, C2, C3)
         self.last_seg_key = seg_key
 
         I = int(self.remaining_inventory)
@@ -181,20 +173,15 @@ class Agent(object):
         m = self.seg_multipliers[seg_key]
         p_dp = p_dp * m
 
-        best_p = 100
-        best_rev = -1
-        model = self.models[seg_key]
+        demand = self.demand
 
-        for p_test in self.PRICE_GRID:
-            rev = p_test * model.predict_proba([[C1, C2, C3, p_test]])[0, 1]
-            if rev > best_rev:
-                best_rev = rev
-                best_p = p_test
+        rev_grid = self.PRICE_GRID * demand.predict_grid((C1, C2, C3), self.PRICE_GRID)
+        best_p = self.PRICE_GRID[int(np.argmax(rev_grid))]
 
         p_static = best_p * m
 
-        prob_dp = model.predict_proba([[C1, C2, C3, p_dp]])[0, 1]
-        prob_static = model.predict_proba([[C1, C2, C3, p_static]])[0, 1]
+        prob_dp = demand.predict_at(C1, C2, C3, p_dp)
+        prob_static = demand.predict_at(C1, C2, C3, p_static)
 
         rev_dp = p_dp * prob_dp
         rev_static = p_static * prob_static
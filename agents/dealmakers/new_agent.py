@@ -1,8 +1,7 @@
-import random
-import pickle
-import os
 import numpy as np
 
+from agents.demand_model import load_demand_model
+from agents.price_search import make_price_search, revenue_function
 
 '''
 This template serves as a starting point for your agent.
@@ -12,8 +11,7 @@ This template serves as a starting point for your agent.
 #picklefile = open('agents/dealmakers/8_models_dict.pkl', 'rb')
 #new_models = pickle.load(picklefile)
 
-picklefile = open('agents/dealmakers/8_xgb.pkl', 'rb')
-new_models = pickle.load(picklefile)
+demand = load_demand_model('xgb')
 
 class Agent(object):
     def __init__(self, agent_number, params={}):
@@ -41,18 +39,11 @@ class Agent(object):
         self.opponent_number = 1 - agent_number  # index for opponent
         
         self.PRICE_GRID = np.linspace(0.01, 500, 100)
+        self.price_search = make_price_search(params.get('price_search', 'grid'))
     
     def _calculate_expected_profit(self, P, C1, C2, C3):
         # Calculate the expect profit from the single costomer
-        t1 = 2.7193025761078644
-        t2 = 2.7215555543935457
-        t3 = 7.262601783583493
-
-        key = (int(C1 > t1), int(C2 > t2), int(C3 > t3))
-        model = new_models[key]
-
-        X = [[P, C1, C2, C3]]
-        prob_buy = model.predict_proba(X)[0, 1]
+        prob_buy = demand.predict_at(C1, C2, C3, P)
 
         return float(P * prob_buy)
     
@@ -167,15 +158,7 @@ class Agent(object):
         
         C1, C2, C3 = new_buyer_covariates
 
-        max_profit = -1.0
-        optimal_price = 1000.0
-
-        for P_test in self.PRICE_GRID:
-            current_profit = self._calculate_expected_profit(P_test, C1, C2, C3)
-            
-            if current_profit > max_profit:
-                max_profit = current_profit
-                optimal_price = P_test
+        optimal_price, max_profit = self.price_search.maximize(revenue_function(demand, C1, C2, C3))
 
         multiplier = self._calculate_competitive_multiplier(T, I_t, I_opp)
 
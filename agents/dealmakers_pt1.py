@@ -1,16 +1,15 @@
-import random
-import pickle
-import os
 import numpy as np
 
+from agents.instrumentation import phase
+from agents.demand_model import load_demand_model
+from agents.price_search import make_price_search, revenue_function
 
 '''
 This template serves as a starting point for your agent.
 '''
 
 
-picklefile = open('agents/dealmakers/8_models_dict.pkl', 'rb')
-new_models = pickle.load(picklefile)
+demand = load_demand_model('logistic')
 
 class Agent(object):
     def __init__(self, agent_number, params={}):
@@ -38,18 +37,12 @@ class Agent(object):
         # self.opponent_number = 1 - agent_number  # index for opponent
         
         self.PRICE_GRID = np.linspace(0.01, 500, 100)
+        # "grid" scores self.PRICE_GRID; see price_search.py for the finer searches
+        self.price_search = make_price_search(params.get('price_search', 'grid'))
     
     def _calculate_expected_profit(self, P, C1, C2, C3):
         # Calculate the expect profit from the single costomer
-        t1 = 2.7193025761078644 #covariate median
-        t2 = 2.7215555543935457
-        t3 = 7.262601783583493
-
-        key = (C1 > t1, C2 > t2, C3 > t3)
-
-        model = new_models[key]
-        
-        prob_buy = model.predict_proba([[C1, C2, C3,P]])[:,1]
+        prob_buy = demand.predict_at(C1, C2, C3, P)
         
         return P * prob_buy
     
@@ -129,17 +122,11 @@ class Agent(object):
         I_t = self.remaining_inventory
         C1, C2, C3 = new_buyer_covariates
 
-        max_profit = -1.0
-        optimal_price = 1000.0
-
-        for P_test in self.PRICE_GRID:
-            current_profit = self._calculate_expected_profit(P_test, C1, C2, C3)
-            
-            if current_profit > max_profit:
-                max_profit = current_profit
-                optimal_price = P_test
+        with phase("demand_model"):
+            optimal_price, max_profit = self.price_search.maximize(revenue_function(demand, C1, C2, C3))
 
-        multiplier = self._calculate_price_multiplier(T, I_t)
+        with phase("multiplier"):
+            multiplier = self._calculate_price_multiplier(T, I_t)
 
         P_offer = optimal_price * multiplier
 
@@ -1,82 +1,76 @@
-import pickle
 import os
 import numpy as np
-import xgboost
-from functools import lru_cache
 from collections import deque
 
+from agents.curve_cache import CurveCache
+from agents.demand_model import load_demand_model
+from agents.demand_table import covariate_key, load_demand_table
+from agents.instrumentation import phase
+from agents.model_registry import get_model
+from agents.segments import segment_key
+
 
 '''
 Unified Agent: Meta-Agent Strategy
 Integrates David (DP) and NewAgent (Inventory/Saturation Heuristic)
 '''
 
-picklefile = open('agents/dealmakers/8_models_dict.pkl', 'rb')
-MODELS_LOGREG = pickle.load(picklefile)
-
-picklefile = open('agents/dealmakers/dp_policy.pkl', 'rb')
-DP_POLICY = pickle.load(picklefile)
-
-picklefile = open('agents/dealmakers/8_xgb.pkl', 'rb')
-MODELS_XGB = pickle.load(picklefile)
+DEMAND_LOGREG = load_demand_model('logistic')
+DP_POLICY = get_model('dp_policy.pkl')
+DEMAND_XGB = load_demand_model('xgb')
 
 PRICE_GRID = np.linspace(0.01, 500, 100)
 
-XGRID_LOGREG_TEMPLATE = np.zeros((PRICE_GRID.shape[0], 4), dtype=float)
-XGRID_LOGREG_TEMPLATE[:, 3] = PRICE_GRID
-
-XGRID_XGB_TEMPLATE = np.zeros((PRICE_GRID.shape[0], 4), dtype=float)
-XGRID_XGB_TEMPLATE[:, 0] = PRICE_GRID
+# precomputed curves of every known customer (None until demand_table.py has been run)
+DEMAND_LOGREG_TABLE = load_demand_table('logistic', PRICE_GRID)
+DEMAND_XGB_TABLE = load_demand_table('xgb', PRICE_GRID)
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-X_SINGLE_LOGREG = np.zeros((1, 4), dtype=np.float32)
-X_SINGLE_XGB = np.zeros((1, 4), dtype=np.float32)
-
+# model outputs for customers missing from the tables, in fixed-size float slabs
+GRID_CACHE_BYTES = 64 << 20
+SINGLE_CACHE_BYTES = 16 << 20
 
-@lru_cache(maxsize=200000)
-def cached_logreg_grid_pred(seg_key, C1, C2, C3):
-    if not MODELS_LOGREG or seg_key not in MODELS_LOGREG:
-        return tuple([0.5] * PRICE_GRID.size)
+LOGREG_GRID_CACHE = CurveCache(PRICE_GRID.size, GRID_CACHE_BYTES)
+XGB_GRID_CACHE = CurveCache(PRICE_GRID.size, GRID_CACHE_BYTES)
+SINGLE_LOGREG_CACHE = CurveCache(1, SINGLE_CACHE_BYTES, dtype=np.float64)
 
-    model = MODELS_LOGREG[seg_key]
-    X = XGRID_LOGREG_TEMPLATE.copy()
-    X[:, 0] = C1
-    X[:, 1] = C2
-    X[:, 2] = C3
 
-    probs = model.predict_proba(X)[:, 1]
-    return tuple(probs.astype(np.float32))
+def cached_logreg_grid_pred(seg_key, C1, C2, C3):
+    """
+    float32 read-only P(buy) curve over PRICE_GRID; valid until the next miss.
+    """
+    key = covariate_key(C1, C2, C3)
+    probs = LOGREG_GRID_CACHE.get(key)
+    if probs is None:
+        if not DEMAND_LOGREG.has_segment(seg_key):
+            probs = LOGREG_GRID_CACHE.put(key, 0.5)
+        else:
+            probs = LOGREG_GRID_CACHE.put(key, DEMAND_LOGREG.predict_grid((C1, C2, C3), PRICE_GRID))
+    return probs
 
 
-@lru_cache(maxsize=200000)
 def cached_single_logreg(seg_key, C1, C2, C3, price):
-    if not MODELS_LOGREG or seg_key not in MODELS_LOGREG:
-        return 0.5
-
-    model = MODELS_LOGREG[seg_key]
-    X_SINGLE_LOGREG[0, 0] = C1
-    X_SINGLE_LOGREG[0, 1] = C2
-    X_SINGLE_LOGREG[0, 2] = C3
-    X_SINGLE_LOGREG[0, 3] = price
-    prob = model.predict_proba(X_SINGLE_LOGREG)[0, 1]
-    return float(prob)
+    key = (C1, C2, C3, price)
+    prob = SINGLE_LOGREG_CACHE.get(key)
+    if prob is None:
+        if not DEMAND_LOGREG.has_segment(seg_key):
+            prob = SINGLE_LOGREG_CACHE.put(key, 0.5)
+        else:
+            prob = SINGLE_LOGREG_CACHE.put(key, DEMAND_LOGREG.predict_at(C1, C2, C3, price))
+    return float(prob[0])
 
 
-@lru_cache(maxsize=200000)
 def cached_xgb_grid_pred(seg_key, C1, C2, C3):
-    if not MODELS_XGB or seg_key not in MODELS_XGB:
-        return tuple([0.5] * PRICE_GRID.size)
-
-    model = MODELS_XGB[seg_key]
-    X = XGRID_XGB_TEMPLATE.copy()
-    X[:, 1] = C1
-    X[:, 2] = C2
-    X[:, 3] = C3
-
-    probs = model.predict_proba(X, validate_features=False)[:, 1]
-    return tuple(probs.astype(np.float32))
+    key = covariate_key(C1, C2, C3)
+    probs = XGB_GRID_CACHE.get(key)
+    if probs is None:
+        if not DEMAND_XGB.has_segment(seg_key):
+            probs = XGB_GRID_CACHE.put(key, 0.5)
+        else:
+            probs = XGB_GRID_CACHE.put(key, DEMAND_XGB.predict_grid((C1, C2, C3), PRICE_GRID))
+    return probs
 
 
 class DavidSubAgent(object):
@@ -84,13 +78,9 @@ class DavidSubAgent(object):
         self.this_agent_number = agent_number
         self.remaining_inventory = params['inventory_limit']
 
-        self.models = MODELS_LOGREG
+        self.demand = DEMAND_LOGREG
         self.dp_policy = DP_POLICY
 
-        self.t1 = 2.7193025761078644
-        self.t2 = 2.7215555543935457
-        self.t3 = 7.262601783583493
-
         if self.dp_policy:
             self.seg_multipliers = {key: 1.0 for key in self.dp_policy.keys()}
             self.seg_sale_history = {key: deque(maxlen=5) for key in self.dp_policy.keys()}
@@ -154,47 +144,47 @@ class DavidSubAgent(object):
 
         C1, C2, C3 = new_buyer_covariates
 
-        seg_key = (C1 > self.t1, C2 > self.t2, C3 > self.t3)
+        seg_key = segment_key(C1, C2, C3)
         self.last_seg_key = seg_key
 
-        models = self.models
-        if not models or seg_key not in models:
+        if not self.demand.has_segment(seg_key):
             return 50.0
 
-        model = models[seg_key]
-
         I = int(self.remaining_inventory)
         dp_policy = self.dp_policy
 
-        if dp_policy and seg_key in dp_policy:
-            max_t = dp_policy[seg_key].shape[1] - 1
-            max_i = dp_policy[seg_key].shape[0] - 1
-            t = max(0, min(time_until_replenish, max_t))
-            i_idx = max(0, min(I, max_i))
+        with phase("dp_lookup"):
+            if dp_policy and seg_key in dp_policy:
+                max_t = dp_policy[seg_key].shape[1] - 1
+                max_i = dp_policy[seg_key].shape[0] - 1
+                t = max(0, min(time_until_replenish, max_t))
+                i_idx = max(0, min(I, max_i))
 
-            p_dp = dp_policy[seg_key][i_idx][t]
-            if p_dp <= 0:
+                p_dp = dp_policy[seg_key][i_idx][t]
+                if p_dp <= 0:
+                    p_dp = 50.0
+            else:
                 p_dp = 50.0
-        else:
-            p_dp = 50.0
 
         m = self.seg_multipliers.get(seg_key, 1.0)
         p_dp = p_dp * m
 
         price_grid = self.PRICE_GRID
 
-        probs_grid = np.fromiter(
-            cached_logreg_grid_pred(seg_key, float(C1), float(C2), float(C3)),
-            dtype=np.float32
-        )
-        rev_grid = price_grid * probs_grid
-        best_idx = int(np.argmax(rev_grid))
-        best_p = float(price_grid[best_idx])
+        with phase("demand_model"):
+            probs_grid = None
+            if DEMAND_LOGREG_TABLE is not None:
+                probs_grid = DEMAND_LOGREG_TABLE.lookup(C1, C2, C3)
+            if probs_grid is None:
+                probs_grid = cached_logreg_grid_pred(seg_key, float(C1), float(C2), float(C3))
+            rev_grid = price_grid * probs_grid
+            best_idx = int(np.argmax(rev_grid))
+            best_p = float(price_grid[best_idx])
 
-        p_static = best_p * m
+            p_static = best_p * m
 
-        prob_dp = cached_single_logreg(seg_key, float(C1), float(C2), float(C3), float(p_dp))
-        prob_static = cached_single_logreg(seg_key, float(C1), float(C2), float(C3), float(p_static))
+            prob_dp = cached_single_logreg(seg_key, float(C1), float(C2), float(C3), float(p_dp))
+            prob_static = cached_single_logreg(seg_key, float(C1), float(C2), float(C3), float(p_static))
 
         rev_dp = p_dp * prob_dp
         rev_static = p_static * prob_static
@@ -225,42 +215,32 @@ class NewSubAgent(object):
         self.remaining_inventory = params['inventory_limit']
         self.opponent_inventory = params['inventory_limit']
 
-        self.models = MODELS_XGB
-
-        self.t1 = 2.7193025761078644
-        self.t2 = 2.7215555543935457
-        self.t3 = 7.262601783583493
+        self.demand = DEMAND_XGB
 
         self.PRICE_GRID = PRICE_GRID
 
     def _calculate_expected_profit(self, P, C1, C2, C3):
-        key = (int(C1 > self.t1), int(C2 > self.t2), int(C3 > self.t3))
-
-        if not self.models or key not in self.models:
+        if not self.demand.has_segment(segment_key(C1, C2, C3)):
             return P * 0.5
 
-        model = self.models[key]
-        X_SINGLE_XGB[0, 0] = P
-        X_SINGLE_XGB[0, 1] = C1
-        X_SINGLE_XGB[0, 2] = C2
-        X_SINGLE_XGB[0, 3] = C3
         try:
-            prob_buy = model.predict_proba(X_SINGLE_XGB, validate_features=False)[0, 1]
+            prob_buy = self.demand.predict_at(C1, C2, C3, P)
         except Exception:
             prob_buy = 0.5
 
         return float(P * prob_buy)
 
     def _calculate_expected_profit_vectorized(self, P_array, C1, C2, C3):
-        key = (int(C1 > self.t1), int(C2 > self.t2), int(C3 > self.t3))
+        key = segment_key(C1, C2, C3)
 
-        if not self.models or key not in self.models:
+        if not self.demand.has_segment(key):
             return P_array * 0.5
 
-        probs = np.fromiter(
-            cached_xgb_grid_pred(key, float(C1), float(C2), float(C3)),
-            dtype=np.float32
-        )
+        probs = None
+        if DEMAND_XGB_TABLE is not None:
+            probs = DEMAND_XGB_TABLE.lookup(C1, C2, C3)
+        if probs is None:
+            probs = cached_xgb_grid_pred(key, float(C1), float(C2), float(C3))
 
         return P_array * probs
 
@@ -310,14 +290,16 @@ class NewSubAgent(object):
         price_grid = self.PRICE_GRID
         optimal_price = 1000.0
 
-        if self.models:
-            profits = self._calculate_expected_profit_vectorized(price_grid, C1, C2, C3)
-            best_idx = int(np.argmax(profits))
-            optimal_price = float(price_grid[best_idx])
-        else:
-            optimal_price = 50.0
+        with phase("demand_model"):
+            if self.demand.segments:
+                profits = self._calculate_expected_profit_vectorized(price_grid, C1, C2, C3)
+                best_idx = int(np.argmax(profits))
+                optimal_price = float(price_grid[best_idx])
+            else:
+                optimal_price = 50.0
 
-        multiplier = self._calculate_competitive_multiplier(T, I_t, I_opp)
+        with phase("multiplier"):
+            multiplier = self._calculate_competitive_multiplier(T, I_t, I_opp)
         P_offer = optimal_price * multiplier
 
         return max(0.01, P_offer)
@@ -0,0 +1,236 @@
+"""
+One purchase-probability API for every agent.
+
+DemandModel hides segment routing (see segments.py) and each model file's
+feature-column order behind three calls:
+
+    demand = load_demand_model("xgb")            # or "logistic"
+
+    demand.predict_grid((C1, C2, C3), PRICE_GRID)   # (m,) for one customer
+    demand.predict_grid(covariates, PRICE_GRID)     # (n, m) for n customers
+    demand.predict_batch(covariates, prices)        # (n,), customer i at prices[i]
+    demand.predict_at(C1, C2, C3, price)            # float
+
+The work is done by a backend. Each backend scores covariates[n, 3] at
+prices[n, m], with the customers already routed to segment rows:
+
+    backend.predict(rows, covariates, prices) -> probs[n, m]
+    backend.predict_grid(rows, covariates, grid) -> probs[n, m], one shared grid[m]
+    backend.predict_at(row, C1, C2, C3, price) -> float
+    backend.price_curve(row, C1, C2, C3)        -> f(prices[m]) -> probs[m]
+    backend.price_breakpoints(row)              -> prices where P(buy) jumps, or None
+    backend.segments                            -> segment keys with a model
+
+BACKENDS maps a name to (default model file, model_registry loader, backend
+class), so a new model family only needs a new entry there.
+"""
+import numpy as np
+
+from agents.logistic_engine import load_logistic_engine
+from agents.model_registry import get_model
+from agents.segments import SEGMENT_KEYS, segment_key, segment_row, segment_rows
+from agents.tree_ensemble import load_xgb_ensembles
+
+FALLBACK_PROB = 0.5
+
+
+class LogisticBackend(object):
+    """
+    8_models_dict.pkl through the closed-form LogisticEngine.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.segments = frozenset(engine.keys)
+
+    def predict(self, rows, covariates, prices):
+        return self.engine.predict(rows, covariates, prices)
+
+    def predict_grid(self, rows, covariates, grid):
+        return self.engine.predict(rows, covariates, grid[None, :])
+
+    def predict_at(self, row, C1, C2, C3, price):
+        return self.engine.predict_at(row, C1, C2, C3, price)
+
+    def price_curve(self, row, C1, C2, C3):
+        return self.engine.price_curve(row, C1, C2, C3)
+
+    def price_breakpoints(self, row):
+        return None
+
+
+class TreeBackend(object):
+    """
+    8_xgb.pkl compiled by tree_ensemble; features are [P, C1, C2, C3].
+    """
+    def __init__(self, ensembles):
+        self.by_row = [ensembles.get(key) for key in SEGMENT_KEYS]
+        self.segments = frozenset(key for key, ensemble in zip(SEGMENT_KEYS, self.by_row) if ensemble is not None)
+        self._breakpoints = {}
+
+    def predict(self, rows, covariates, prices):
+        n, m = prices.shape
+        out = np.full((n, m), FALLBACK_PROB)
+        for row in np.unique(rows):
+            ensemble = self.by_row[row]
+            if ensemble is None:
+                continue
+            sel = np.flatnonzero(rows == row)
+            X = np.empty((sel.size * m, 4), dtype=np.float32)
+            X[:, 0] = prices[sel].ravel()
+            X[:, 1:] = np.repeat(covariates[sel], m, axis=0)
+            out[sel] = ensemble.predict_positive(X).reshape(sel.size, m)
+        return out
+
+    def predict_grid(self, rows, covariates, grid):
+        out = np.full((covariates.shape[0], grid.size), FALLBACK_PROB)
+        for row in np.unique(rows):
+            ensemble = self.by_row[row]
+            if ensemble is None:
+                continue
+            sel = np.flatnonzero(rows == row)
+            X = np.empty((sel.size, 4), dtype=np.float32)
+            X[:, 0] = 0.0
+            X[:, 1:] = covariates[sel]
+            out[sel] = ensemble.predict_grid_positive(X, grid, column=0)
+        return out
+
+    def predict_at(self, row, C1, C2, C3, price):
+        ensemble = self.by_row[row]
+        if ensemble is None:
+            return FALLBACK_PROB
+        return float(ensemble.predict_positive(np.array([[price, C1, C2, C3]], dtype=np.float32))[0])
+
+    def price_curve(self, row, C1, C2, C3):
+        ensemble = self.by_row[row]
+        covariates = np.array([C1, C2, C3], dtype=np.float32)
+
+        def curve(prices):
+            prices = np.asarray(prices)
+            if ensemble is None:
+                return np.full(prices.shape, FALLBACK_PROB)
+            X = np.empty((prices.size, 4), dtype=np.float32)
+            X[:, 0] = prices
+            X[:, 1:] = covariates
+            return ensemble.predict_positive(X)
+        return curve
+
+    def price_breakpoints(self, row):
+        """
+        P(buy) is a step function of price: it can only change at the price
+        thresholds of the segment's trees.
+        """
+        if row not in self._breakpoints:
+            ensemble = self.by_row[row]
+            self._breakpoints[row] = None if ensemble is None else ensemble.split_values(0)
+        return self._breakpoints[row]
+
+
+class SklearnBackend(object):
+    """
+    Any {segment key: classifier with predict_proba} dict; `columns` is the
+    model's feature order, e.g. ("P", "C1", "C2", "C3").
+    """
+    def __init__(self, models, columns=("C1", "C2", "C3", "P")):
+        self.by_row = [models.get(key) for key in SEGMENT_KEYS]
+        self.segments = frozenset(key for key, model in zip(SEGMENT_KEYS, self.by_row) if model is not None)
+        # column j of the model input is column order[j] of [C1, C2, C3, P]
+        self.order = [("C1", "C2", "C3", "P").index(name) for name in columns]
+
+    def predict(self, rows, covariates, prices):
+        n, m = prices.shape
+        out = np.full((n, m), FALLBACK_PROB)
+        for row in np.unique(rows):
+            model = self.by_row[row]
+            if model is None:
+                continue
+            sel = np.flatnonzero(rows == row)
+            X = np.empty((sel.size * m, 4))
+            X[:, :3] = np.repeat(covariates[sel], m, axis=0)
+            X[:, 3] = prices[sel].ravel()
+            out[sel] = model.predict_proba(X[:, self.order])[:, 1].reshape(sel.size, m)
+        return out
+
+    def predict_grid(self, rows, covariates, grid):
+        return self.predict(rows, covariates, np.broadcast_to(grid, (covariates.shape[0], grid.size)))
+
+    def predict_at(self, row, C1, C2, C3, price):
+        rows = np.array([row])
+        return float(self.predict(rows, np.array([[C1, C2, C3]], dtype=float), np.array([[price]], dtype=float))[0, 0])
+
+    def price_curve(self, row, C1, C2, C3):
+        rows = np.array([row])
+        covariates = np.array([[C1, C2, C3]], dtype=float)
+
+        def curve(prices):
+            prices = np.asarray(prices, dtype=float)
+            return self.predict(rows, covariates, prices.reshape(1, -1))[0]
+        return curve
+
+    def price_breakpoints(self, row):
+        return None
+
+
+class DemandModel(object):
+    def __init__(self, backend):
+        self.backend = backend
+        self.segments = backend.segments
+
+    def has_segment(self, key):
+        return tuple(int(v) for v in key) in self.segments
+
+    def predict_grid(self, covariates, price_grid):
+        """
+        P(buy) at every price of price_grid[m], for one customer (3,) -> (m,)
+        or for each of covariates[n, 3] -> (n, m).
+        """
+        covariates = np.asarray(covariates, dtype=float)
+        C = covariates.reshape(-1, 3)
+        probs = self.backend.predict_grid(segment_rows(C), C, np.asarray(price_grid, dtype=float).ravel())
+        return probs[0] if covariates.ndim == 1 else probs
+
+    def predict_batch(self, covariates, prices):
+        """
+        P(buy) of customer covariates[i] at prices[i] (or one shared price), shape (n,).
+        """
+        C = np.asarray(covariates, dtype=float).reshape(-1, 3)
+        prices = np.broadcast_to(np.asarray(prices, dtype=float).reshape(-1, 1), (C.shape[0], 1))
+        return self.backend.predict(segment_rows(C), C, prices)[:, 0]
+
+    def predict_at(self, C1, C2, C3, price):
+        return self.backend.predict_at(segment_row(segment_key(C1, C2, C3)), C1, C2, C3, price)
+
+    def price_curve(self, C1, C2, C3):
+        """
+        f(prices) -> P(buy) for this one customer, routed once; for searches
+        that evaluate the same customer many times.
+        """
+        return self.backend.price_curve(segment_row(segment_key(C1, C2, C3)), C1, C2, C3)
+
+    def price_breakpoints(self, C1, C2, C3):
+        """
+        Sorted prices at which this customer's P(buy) can jump (the model is
+        piecewise constant in price between them), or None for smooth models.
+        """
+        return self.backend.price_breakpoints(segment_row(segment_key(C1, C2, C3)))
+
+
+BACKENDS = {
+    "logistic": ("8_models_dict.pkl", load_logistic_engine, LogisticBackend),
+    "xgb": ("8_xgb.pkl", load_xgb_ensembles, TreeBackend),
+}
+
+
+def load_demand_model(kind="xgb", name=None):
+    """
+    DemandModel over the shared (model_registry) artifact of backend `kind`,
+    read from model file `name` (default: the backend's usual file).
+    """
+    filename, loader, backend = BACKENDS[kind]
+    return DemandModel(backend(get_model(name or filename, loader)))
+
+
+def load_demand_model_or_none(kind="xgb", name=None):
+    try:
+        return load_demand_model(kind, name)
+    except FileNotFoundError:
+        return None
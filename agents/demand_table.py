@@ -0,0 +1,166 @@
+"""
+Precomputed demand curves for every known customer.
+
+Customers are drawn with replacement from a finite dataset, so the same
+covariate triple comes back again and again. The offline build step
+evaluates a DemandModel once per distinct customer across the price grid
+and stores:
+
+  demand_table_<kind>.npy       float32 curves[n_customers, n_prices] (memory-mapped on load)
+  demand_table_<kind>.keys.npy  float64 covariates[n_customers, 3], row order of the curves
+  demand_table_<kind>.json      price grid, row count and the SHA-256 of the model file
+
+At decision time the exact covariate bytes index a dict, and a hit is a
+row view into the memory map. Only unseen covariates fall back to the
+model:
+
+    table = load_demand_table('xgb', PRICE_GRID)   # None if not built or stale
+    curve = table.lookup(C1, C2, C3) if table is not None else None
+
+Build it (the encrypted data files are read through the env, the plain
+test file directly):
+
+    python -m agents.demand_table --kind xgb --test_file data/test_user_info_2025.csv \
+        --first_file data/datafile1_2025.csv --second_file data/datafile2_2025.csv
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from agents.demand_model import BACKENDS, load_demand_model
+from agents.model_registry import PACKAGE_DIR, digest, resolve
+
+TABLE_DIR = os.path.join(PACKAGE_DIR, "dealmakers")
+PRICE_GRID = np.linspace(0.01, 500, 100)
+CHUNK_ROWS = 4096
+
+_KEY = struct.Struct("<3d")
+
+
+def covariate_key(C1, C2, C3):
+    """
+    Exact bytes of a covariate triple as float64, the table's index key.
+    """
+    return _KEY.pack(C1, C2, C3)
+
+
+def table_paths(kind, table_dir=TABLE_DIR):
+    base = os.path.join(table_dir, "demand_table_{}".format(kind))
+    return base + ".npy", base + ".keys.npy", base + ".json"
+
+
+def build_demand_table(kind, covariates, price_grid=PRICE_GRID, table_dir=TABLE_DIR, chunk_rows=CHUNK_ROWS):
+    """
+    Evaluate backend `kind` for every distinct row of covariates[n, 3] at
+    every price of price_grid and write the table files. Returns the row count.
+    """
+    keys = np.unique(np.asarray(covariates, dtype=np.float64).reshape(-1, 3), axis=0)
+    price_grid = np.asarray(price_grid, dtype=np.float64)
+    demand = load_demand_model(kind)
+    curves_path, keys_path, meta_path = table_paths(kind, table_dir)
+    os.makedirs(table_dir, exist_ok=True)
+
+    curves = np.lib.format.open_memmap(curves_path, mode="w+", dtype=np.float32,
+                                       shape=(keys.shape[0], price_grid.size))
+    for start in range(0, keys.shape[0], chunk_rows):
+        stop = min(start + chunk_rows, keys.shape[0])
+        curves[start:stop] = demand.predict_grid(keys[start:stop], price_grid)
+    curves.flush()
+    del curves
+    np.save(keys_path, keys)
+
+    meta = {
+        "kind": kind,
+        "rows": int(keys.shape[0]),
+        "price_grid": price_grid.tolist(),
+        "model_sha256": digest(resolve(BACKENDS[kind][0])),
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return keys.shape[0]
+
+
+class DemandTable(object):
+    def __init__(self, curves, keys, price_grid):
+        self.curves = curves
+        self.price_grid = price_grid
+        self.index = {covariate_key(*row): i for i, row in enumerate(keys.tolist())}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.curves.shape[0]
+
+    def lookup(self, C1, C2, C3):
+        """
+        float32 P(buy) curve over price_grid for this exact customer, or None.
+        """
+        row = self.index.get(_KEY.pack(C1, C2, C3))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.curves[row]
+
+    def stats(self):
+        return {"rows": len(self), "hits": self.hits, "misses": self.misses}
+
+
+def load_demand_table(kind, price_grid=None, table_dir=TABLE_DIR):
+    """
+    Memory-mapped DemandTable for backend `kind`, or None when it has not been
+    built, was built for another price grid, or its model file has changed.
+    """
+    curves_path, keys_path, meta_path = table_paths(kind, table_dir)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta["model_sha256"] != digest(resolve(BACKENDS[kind][0])):
+            return None
+        grid = np.asarray(meta["price_grid"])
+        if price_grid is not None and not np.array_equal(grid, np.asarray(price_grid, dtype=np.float64)):
+            return None
+        curves = np.load(curves_path, mmap_mode="r")
+        keys = np.load(keys_path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return DemandTable(curves, keys, grid)
+
+
+def _read_covariates(args):
+    import pandas as pd
+
+    blocks = []
+    for path in args.test_file:
+        blocks.append(pd.read_csv(path)[["Covariate1", "Covariate2", "Covariate3"]].to_numpy(np.float64))
+    if args.first_file is not None:
+        sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+        from algopricing_opy.MultiAgentEnv_algopricing import MultiAgentEnv_algopricing
+        from settings import default_params_2
+
+        env = MultiAgentEnv_algopricing(default_params_2, ["a", "b"], args.first_file, args.second_file)
+        blocks.append(np.asarray(env.sampler.covariates, dtype=np.float64))
+    return np.concatenate(blocks) if blocks else np.empty((0, 3))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the demand curves of every known customer.")
+    parser.add_argument("--kind", choices=sorted(BACKENDS), default="xgb")
+    parser.add_argument("--test_file", nargs="*", default=[], help="plain CSVs with Covariate1-3 columns")
+    parser.add_argument("--first_file", default=None, help="encrypted covariate file read through the env")
+    parser.add_argument("--second_file", default=None)
+    parser.add_argument("--table_dir", default=TABLE_DIR)
+    args = parser.parse_args(argv)
+
+    covariates = _read_covariates(args)
+    rows = build_demand_table(args.kind, covariates, table_dir=args.table_dir)
+    print("{} table: {} distinct customers x {} prices -> {}".format(
+        args.kind, rows, PRICE_GRID.size, table_paths(args.kind, args.table_dir)[0]))
+
+
+if __name__ == "__main__":
+    main()
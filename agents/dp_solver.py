@@ -0,0 +1,149 @@
+"""
+Backward-induction solver that regenerates dp_policy.pkl from the demand models.
+
+State: inventory i = 0..max_inventory and customers left in the replenishment
+window t = 0..horizon (the current customer included). Each arriving
+customer is drawn from the segment mix. For a customer of segment s, the
+offered price p earns p * P_s(p) and uses up a unit with probability P_s(p):
+
+    delta[i, t]   = V[i, t] - V[i - 1, t]                          (value of the marginal unit)
+    policy[s, i, t] = argmax_p  P_s(p) * (p - delta[i, t - 1])
+    V[i, t]       = V[i, t - 1] + sum_s w_s * max_p P_s(p) * (p - delta[i, t - 1])
+
+P_s is the segment's purchase curve averaged over its customers, and w_s is
+its share of them. Every step is one (segments x inventory x prices) NumPy
+array, so a solve takes a couple of milliseconds once the curves exist.
+Inventory is reset at replenishment, so the random inventory limit only
+picks the starting state of a window. expected_window_value() averages
+V[L, horizon] over the limits L.
+
+    demand = load_demand_model('logistic')
+    curves, weights = segment_demand(demand, covariates)
+    policy, value = solve_policy(curves, weights)          # policy[row][i][t], as in dp_policy.pkl
+
+    python -m agents.dp_solver --out /tmp/dp_policy.pkl
+    python -m agents.dp_solver --kind xgb --out /tmp/dp_policy_xgb.pkl
+
+dp_policy.pkl is priced by david and DavidSubAgent with the logistic demand
+model, so that is the default --kind. --out has no default, so the tracked
+table is only replaced when its path is given explicitly.
+"""
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+from agents.demand_model import BACKENDS, load_demand_model
+from agents.model_registry import PACKAGE_DIR
+from agents.segments import SEGMENT_KEYS, segment_rows
+
+PRICE_GRID = np.linspace(0.01, 500, 100)
+MAX_INVENTORY = 20
+HORIZON = 20
+INVENTORY_LIMITS = range(7, 21)
+PER_SEGMENT = 256
+DP_POLICY_PATH = os.path.join(PACKAGE_DIR, "dealmakers", "dp_policy.pkl")
+
+
+def segment_demand(demand, covariates, price_grid=PRICE_GRID, per_segment=PER_SEGMENT, seed=0):
+    """
+    (curves[8, m], weights[8]): the mean P(buy) curve over price_grid of the
+    customers of each segment in covariates[n, 3] (a random sample of at most
+    per_segment of them), and each segment's share of the customers.
+    A segment with no customers gets the overall mean curve.
+    """
+    covariates = np.asarray(covariates, dtype=float).reshape(-1, 3)
+    rows = segment_rows(covariates)
+    rng = np.random.default_rng(seed)
+    sample = []
+    for row in range(len(SEGMENT_KEYS)):
+        members = np.flatnonzero(rows == row)
+        if per_segment is not None and members.size > per_segment:
+            members = rng.choice(members, per_segment, replace=False)
+        sample.append(members)
+    sample = np.concatenate(sample)
+
+    probs = demand.predict_grid(covariates[sample], price_grid)
+    counts = np.bincount(rows[sample], minlength=len(SEGMENT_KEYS))
+    sums = np.zeros((len(SEGMENT_KEYS), probs.shape[1]))
+    np.add.at(sums, rows[sample], probs)
+    curves = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], probs.mean(axis=0))
+    weights = np.bincount(rows, minlength=len(SEGMENT_KEYS)) / float(rows.size)
+    return curves, weights
+
+
+def solve_policy(curves, weights, price_grid=PRICE_GRID, max_inventory=MAX_INVENTORY, horizon=HORIZON):
+    """
+    (policy[segments, max_inventory + 1, horizon + 1], V[max_inventory + 1, horizon + 1]).
+    policy[s, i, t] is the price for a customer of segment row s with
+    inventory i and t customers left. It is 0 where i or t is 0, as in
+    dp_policy.pkl.
+    """
+    curves = np.asarray(curves, dtype=float)
+    price_grid = np.asarray(price_grid, dtype=float)
+    value = np.zeros((max_inventory + 1, horizon + 1))
+    policy = np.zeros((curves.shape[0], max_inventory + 1, horizon + 1))
+    revenue = curves * price_grid
+    for t in range(1, horizon + 1):
+        prev = value[:, t - 1]
+        delta = prev[1:] - prev[:-1]
+        gain = revenue[:, None, :] - curves[:, None, :] * delta[None, :, None]
+        best = gain.argmax(axis=2)
+        policy[:, 1:, t] = price_grid[best]
+        value[1:, t] = prev[1:] + weights @ np.take_along_axis(gain, best[:, :, None], axis=2)[:, :, 0]
+    return policy, value
+
+
+def expected_window_value(value, limits=INVENTORY_LIMITS, horizon=HORIZON):
+    """
+    Expected revenue of one replenishment window under a uniformly random
+    inventory limit.
+    """
+    return float(np.mean([value[limit, horizon] for limit in limits]))
+
+
+def policy_tables(policy):
+    """
+    {segment key: policy[i][t]}, the dp_policy.pkl layout.
+    """
+    return {key: policy[row] for row, key in enumerate(SEGMENT_KEYS)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate dp_policy.pkl by backward induction.")
+    parser.add_argument("--kind", choices=sorted(BACKENDS), default="logistic",
+                        help="demand model to solve under (david prices with logistic)")
+    parser.add_argument("--test_file", default="data/test_user_info_2025.csv",
+                        help="CSV with Covariate1-3: the customer population")
+    parser.add_argument("--per_segment", type=int, default=PER_SEGMENT)
+    parser.add_argument("--max_inventory", type=int, default=MAX_INVENTORY)
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="inventory_replenish")
+    parser.add_argument("--out", required=True,
+                        help="policy pickle to write (the agents load {})".format(DP_POLICY_PATH))
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    covariates = pd.read_csv(args.test_file)[["Covariate1", "Covariate2", "Covariate3"]].to_numpy(np.float64)
+    demand = load_demand_model(args.kind)
+    start = time.perf_counter()
+    curves, weights = segment_demand(demand, covariates, per_segment=args.per_segment)
+    curve_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    policy, value = solve_policy(curves, weights, max_inventory=args.max_inventory, horizon=args.horizon)
+    solve_seconds = time.perf_counter() - start
+
+    tmp = args.out + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(policy_tables(policy), f)
+    os.replace(tmp, args.out)
+    limits = range(min(INVENTORY_LIMITS.start, args.max_inventory), args.max_inventory + 1)
+    print("{} policy -> {}: curves {:.3f}s, solve {:.2f} ms, expected revenue per window {:.2f}".format(
+        args.kind, args.out, curve_seconds, 1e3 * solve_seconds,
+        expected_window_value(value, limits, args.horizon)))
+
+
+if __name__ == "__main__":
+    main()
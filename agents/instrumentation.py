@@ -0,0 +1,165 @@
+"""
+Opt-in latency instrumentation for Agent.action.
+
+InstrumentedAgent wraps an agent and times every action() call into a
+fixed-size log-spaced histogram, so memory stays constant however long the
+match runs. report() gives p50/p95/p99/max per agent and counts calls that
+exceeded the per-action budget (0.5 s in the competition).
+
+Agents can break their own time down into phases:
+
+    from agents.instrumentation import phase
+
+    with phase("demand_model"):
+        probs = model.predict_proba(X)
+
+phase() is a no-op unless the call happens inside an instrumented action().
+"""
+import math
+from time import perf_counter
+
+import numpy as np
+
+ACTION_BUDGET = 0.5
+
+# log-spaced latency bins from 1 us to 100 s
+HIST_MIN = 1e-6
+HIST_MAX = 1e2
+HIST_BINS = 256
+
+_active = None
+
+
+class LatencyHistogram(object):
+    def __init__(self):
+        self.edges = np.geomspace(HIST_MIN, HIST_MAX, HIST_BINS + 1)
+        self._log_min = math.log(HIST_MIN)
+        self._log_step = (math.log(HIST_MAX) - self._log_min) / HIST_BINS
+        self.counts = np.zeros(HIST_BINS + 2, dtype=np.int64)  # plus under/overflow
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        if seconds <= HIST_MIN:
+            b = 0
+        elif seconds >= HIST_MAX:
+            b = HIST_BINS + 1
+        else:
+            b = 1 + int((math.log(seconds) - self._log_min) / self._log_step)
+        self.counts[b] += 1
+        self.n += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """
+        Upper edge of the bin holding the q-th percentile (q in [0, 100]).
+        """
+        if self.n == 0:
+            return float("nan")
+        rank = int(np.ceil(q / 100.0 * self.n))
+        b = int(np.searchsorted(np.cumsum(self.counts), max(rank, 1)))
+        if b == 0:
+            return HIST_MIN
+        if b > HIST_BINS:
+            return self.max
+        return float(min(self.edges[b], self.max))
+
+    def summary(self):
+        return {
+            "calls": self.n,
+            "mean": self.total / self.n if self.n else float("nan"),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "total": self.total,
+        }
+
+
+class _Phase(object):
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if _active is not None:
+            _active.add_phase(self.name, perf_counter() - self.start)
+        return False
+
+
+def phase(name):
+    return _Phase(name)
+
+
+class InstrumentedAgent(object):
+    def __init__(self, agent, name=None, budget=ACTION_BUDGET):
+        self.agent = agent
+        self.name = name if name is not None else type(agent).__module__
+        self.budget = budget
+        self.latency = LatencyHistogram()
+        self.phases = {}
+        self.violations = 0
+        self.worst_step = None
+        self.step = 0
+
+    def __getattr__(self, attr):
+        # everything except action() goes straight to the wrapped agent
+        return getattr(self.agent, attr)
+
+    def add_phase(self, name, seconds):
+        hist = self.phases.get(name)
+        if hist is None:
+            hist = self.phases[name] = LatencyHistogram()
+        hist.add(seconds)
+
+    def action(self, obs):
+        global _active
+        previous, _active = _active, self
+        start = perf_counter()
+        try:
+            return self.agent.action(obs)
+        finally:
+            elapsed = perf_counter() - start
+            _active = previous
+            if elapsed > self.latency.max:
+                self.worst_step = self.step
+            self.latency.add(elapsed)
+            if elapsed > self.budget:
+                self.violations += 1
+            self.step += 1
+
+    def report(self):
+        out = self.latency.summary()
+        out["name"] = self.name
+        out["budget"] = self.budget
+        out["violations"] = self.violations
+        out["worst_step"] = self.worst_step
+        out["phases"] = {name: hist.summary() for name, hist in self.phases.items()}
+        return out
+
+
+def instrument(agents, names=None, budget=ACTION_BUDGET):
+    if names is None:
+        names = [None] * len(agents)
+    return [InstrumentedAgent(agent, name, budget) for agent, name in zip(agents, names)]
+
+
+def format_report(report):
+    ms = 1e3
+    lines = ["{name}: {calls} calls, p50 {p50:.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms, max {max:.3f} ms, "
+             "{violations} over the {budget:.2f} s budget".format(
+                 name=report["name"], calls=report["calls"], p50=ms * report["p50"], p95=ms * report["p95"],
+                 p99=ms * report["p99"], max=ms * report["max"], violations=report["violations"],
+                 budget=report["budget"])]
+    for name, stats in sorted(report["phases"].items(), key=lambda item: -item[1]["total"]):
+        lines.append("    {:<16s} {:6.1f}% of time, p50 {:.3f} ms, p99 {:.3f} ms".format(
+            name, 100.0 * stats["total"] / max(report["total"], 1e-12), ms * stats["p50"], ms * stats["p99"]))
+    return "\n".join(lines)
@@ -0,0 +1,108 @@
+"""
+Closed-form evaluator for the 8-segment logistic purchase models.
+
+Every model in 8_models_dict.pkl is a binary sklearn LogisticRegression on
+the features [C1, C2, C3, P], so P(buy) is sigmoid(w . [C1, C2, C3, P] + b).
+LogisticEngine pulls coef_ and intercept_ out of all eight into one (8, 5)
+array, rows [w_C1, w_C2, w_C3, w_P, b], and scores a whole price grid or a
+batch of customers with a single matmul and sigmoid. predict() is the one
+implementation; predict_at() and price_curve() go through it, and so does
+demand_model.LogisticBackend:
+
+    from agents.model_registry import get_model
+    from agents.logistic_engine import load_logistic_engine
+
+    engine = get_model('8_models_dict.pkl', load_logistic_engine)
+    probs = engine.predict(segment_rows(covariates), covariates, PRICE_GRID[None, :])
+
+equivalence_report() checks predict() against sklearn's predict_proba.
+"""
+import pickle
+
+import numpy as np
+
+from agents.segments import SEGMENT_KEYS, SEGMENT_THRESHOLDS, segment_row
+
+N_FEATURES = 4
+TOLERANCE = 1e-12
+
+
+def _sigmoid(z):
+    # tanh form: no overflow warnings for large |z|
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+class LogisticEngine(object):
+    def __init__(self, coef, keys=None):
+        self.coef = coef
+        self.keys = list(SEGMENT_KEYS) if keys is None else list(keys)
+
+    @classmethod
+    def from_models(cls, models):
+        """
+        Build from a {segment key: LogisticRegression} dict. Missing segments
+        get all-zero coefficients (P(buy) = 0.5), like the agents' fallback.
+        """
+        coef = np.zeros((len(SEGMENT_KEYS), N_FEATURES + 1))
+        for key, model in models.items():
+            if list(model.classes_) != [False, True] and list(model.classes_) != [0, 1]:
+                raise ValueError("segment {} is not a binary purchase model".format(key))
+            row = segment_row(key)
+            coef[row, :N_FEATURES] = model.coef_[0]
+            coef[row, N_FEATURES] = model.intercept_[0]
+        return cls(coef, [SEGMENT_KEYS[segment_row(key)] for key in models])
+
+    def predict(self, rows, covariates, prices):
+        """
+        P(buy) of customer covariates[i] (segment row rows[i]) at prices[i, :],
+        or at one shared prices[1, m]; shape (n, m).
+        """
+        w = self.coef[rows]
+        base = (np.asarray(covariates, dtype=float) * w[:, :3]).sum(axis=1) + w[:, N_FEATURES]
+        return _sigmoid(base[:, None] + w[:, 3:4] * np.asarray(prices, dtype=float))
+
+    def predict_at(self, row, C1, C2, C3, price):
+        return float(self.predict(np.array([row]), np.array([[C1, C2, C3]], dtype=float),
+                                  np.array([[price]], dtype=float))[0, 0])
+
+    def price_curve(self, row, C1, C2, C3):
+        """
+        f(prices[m]) -> P(buy)[m] for one customer of segment row `row`.
+        """
+        rows, covariates = np.array([row]), np.array([[C1, C2, C3]], dtype=float)
+
+        def curve(prices):
+            return self.predict(rows, covariates, np.asarray(prices, dtype=float)[None, :])[0]
+        return curve
+
+
+def load_logistic_engine(path):
+    """
+    model_registry loader: unpickle an 8_models_dict.pkl-style dict into an engine.
+    """
+    with open(path, "rb") as f:
+        return LogisticEngine.from_models(pickle.load(f))
+
+
+def equivalence_report(models, engine, n_rows=1000, seed=0):
+    """
+    Largest |P(buy)| difference between sklearn's predict_proba and the
+    engine, per segment, on random rows covering the price grid.
+    """
+    rng = np.random.default_rng(seed)
+    per_segment = {}
+    for key, model in models.items():
+        X = np.column_stack([
+            rng.uniform(0.0, 2.0 * SEGMENT_THRESHOLDS, size=(n_rows, 3)),
+            rng.uniform(0.01, 500.0, size=n_rows),
+        ])
+        expected = model.predict_proba(X)[:, 1]
+        rows = np.full(n_rows, segment_row(key))
+        per_segment[key] = float(np.max(np.abs(engine.predict(rows, X[:, :3], X[:, 3:4])[:, 0] - expected)))
+    worst = max(per_segment.values()) if per_segment else 0.0
+    return {
+        "max_abs_error": worst,
+        "per_segment": per_segment,
+        "tolerance": TOLERANCE,
+        "ok": worst <= TOLERANCE,
+    }
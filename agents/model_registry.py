@@ -0,0 +1,147 @@
+"""
+Shared, content-addressed registry for the agents' model artifacts.
+
+Model files (8_xgb.pkl, 8_models_dict.pkl, dp_policy.pkl, trained_model, ...)
+are resolved from the package directory rather than the working directory,
+loaded once per process per distinct content (SHA-256), and handed out as
+shared handles: every agent that asks for the same bytes gets the same object.
+Dicts come back as read-only mappings and NumPy arrays inside them are marked
+non-writeable, so one agent cannot silently change another agent's model.
+
+When a model file has been exported with agents.artifacts, and the export is
+of the current bytes (or the pickle is gone), get_model() memory-maps the
+artifact instead of unpickling. The result is the same as what the loader
+would have built from the pickle, and xgboost/sklearn are never imported.
+"""
+import hashlib
+import json
+import os
+import pickle
+import types
+
+import numpy as np
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_DIRS = [
+    os.path.join(PACKAGE_DIR, "dealmakers"),
+    PACKAGE_DIR,
+]
+
+ARTIFACT_DIRNAME = "artifacts"
+
+# (path, mtime_ns, size) -> sha256 / manifest, and (sha256, loader) -> loaded object
+_digests = {}
+_manifests = {}
+_by_digest = {}
+
+
+def resolve(name):
+    """
+    Absolute path of model file `name`: an existing absolute path, or a file
+    name / relative path looked up under the agents package directories.
+    """
+    if os.path.isabs(name):
+        if os.path.isfile(name):
+            return name
+        raise FileNotFoundError(name)
+    for base in SEARCH_DIRS:
+        path = os.path.join(base, name)
+        if os.path.isfile(path):
+            return path
+    # accept paths written relative to the repo root, e.g. 'agents/dealmakers/8_xgb.pkl'
+    path = os.path.join(os.path.dirname(PACKAGE_DIR), name)
+    if os.path.isfile(path):
+        return path
+    raise FileNotFoundError("model file {!r} not found in {}".format(name, SEARCH_DIRS))
+
+
+def digest(path):
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _digests:
+        with open(path, "rb") as f:
+            _digests[key] = hashlib.sha256(f.read()).hexdigest()
+    return _digests[key]
+
+
+def _freeze(obj):
+    if isinstance(obj, np.ndarray):
+        obj.setflags(write=False)
+        return obj
+    if isinstance(obj, dict):
+        return types.MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    return obj
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _read_manifest(path):
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _manifests:
+        with open(path, "r") as f:
+            _manifests[key] = json.load(f)
+    return _manifests[key]
+
+
+def find_artifact(name, loader=_load_pickle):
+    """
+    manifest.json of an exported artifact that stands in for model file
+    `name` as built by `loader`, or None. Exports of other bytes than the
+    current pickle are ignored.
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    loader_name = "{}:{}".format(loader.__module__, loader.__qualname__)
+    for base in [os.path.dirname(name)] if os.path.isabs(name) else SEARCH_DIRS:
+        path = os.path.join(base, ARTIFACT_DIRNAME, stem, "manifest.json")
+        if not os.path.isfile(path):
+            continue
+        manifest = _read_manifest(path)
+        if manifest.get("loader") != loader_name:
+            continue
+        try:
+            source = resolve(name)
+        except FileNotFoundError:
+            return path
+        if manifest.get("source_sha256") == digest(source):
+            return path
+    return None
+
+
+def get_model(name, loader=_load_pickle):
+    """
+    Shared read-only handle to the artifact stored in model file `name`, as
+    built by `loader` (one shared object per distinct content and loader).
+    """
+    manifest = find_artifact(name, loader)
+    if manifest is not None:
+        key = (digest(manifest), loader)
+        if key not in _by_digest:
+            from agents.artifacts import load_artifact
+            _by_digest[key] = _freeze(load_artifact(manifest))
+        return _by_digest[key]
+    path = resolve(name)
+    key = (digest(path), loader)
+    if key not in _by_digest:
+        _by_digest[key] = _freeze(loader(path))
+    return _by_digest[key]
+
+
+def get_model_or_none(name, loader=_load_pickle):
+    try:
+        return get_model(name, loader)
+    except FileNotFoundError:
+        return None
+
+
+def loaded_models():
+    return dict(_by_digest)
+
+
+def clear():
+    _digests.clear()
+    _manifests.clear()
+    _by_digest.clear()
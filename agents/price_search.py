@@ -0,0 +1,200 @@
+"""
+Price optimizers for the agents' myopic step: maximise revenue(p) = p * P(buy | p)
+over [PRICE_MIN, PRICE_MAX].
+
+Every optimizer calls f(prices) -> revenues with a batch of prices, so one
+call is one model evaluation however many prices it holds. They keep
+counters of calls and of prices evaluated.
+
+  GridSearch(n)             the fixed np.linspace grid the agents have always used
+  CoarseToFine(c, r, k)     c-point grid, then k rounds of r points around the best
+  GoldenSection(c, n)       c-point bracket, then n golden-section steps
+  FOCBisection(c, n)        c-point bracket, then n bisection steps on the sign of
+                            d revenue / dp (a central difference, 2 prices per call)
+  BreakpointSearch()        exact for piecewise-constant (tree) demand: scores the
+                            largest price below every price split, in one call
+
+The refining searches assume revenue is unimodal within one coarse step of
+the best coarse point. That holds for the smooth logistic curves. A search
+never returns a price worse than its best coarse point.
+
+Tree-ensemble demand is a step function of price, so revenue p * P(buy)
+rises on every step and peaks just below a split threshold. The local
+searches stall on its flat stretches. BreakpointSearch evaluates exactly
+those candidate prices. "auto" uses it when the demand model reports
+breakpoints, and CoarseToFine otherwise.
+
+    search = make_price_search("coarse_to_fine")
+    price, revenue = search.maximize(revenue_function(demand, C1, C2, C3))
+"""
+import abc
+
+import numpy as np
+
+PRICE_MIN = 0.01
+PRICE_MAX = 500.0
+
+INV_PHI = (np.sqrt(5.0) - 1.0) / 2.0
+
+
+def revenue_function(demand, C1, C2, C3):
+    """
+    f(prices) -> prices * P(buy) for one customer, from a DemandModel;
+    f.breakpoints holds the model's price breakpoints (None if smooth).
+    """
+    curve = demand.price_curve(C1, C2, C3)
+
+    def f(prices):
+        return prices * curve(prices)
+    f.breakpoints = demand.price_breakpoints(C1, C2, C3)
+    return f
+
+
+class PriceSearch(abc.ABC):
+    """
+    Base of the searches: bounds, evaluation counters and the coarse bracket.
+    Subclasses implement maximize(f) -> (price, revenue).
+    """
+    def __init__(self, lo=PRICE_MIN, hi=PRICE_MAX):
+        self.lo = lo
+        self.hi = hi
+        self.calls = 0
+        self.evals = 0
+
+    def _eval(self, f, prices):
+        prices = np.asarray(prices, dtype=float)
+        self.calls += 1
+        self.evals += prices.size
+        return np.asarray(f(prices), dtype=float)
+
+    def _coarse(self, f, n):
+        """
+        Best of an n-point grid and the bracket [best - step, best + step].
+        """
+        grid = np.linspace(self.lo, self.hi, n)
+        values = self._eval(f, grid)
+        best = int(np.argmax(values))
+        step = grid[1] - grid[0] if n > 1 else self.hi - self.lo
+        return grid[best], values[best], max(self.lo, grid[best] - step), min(self.hi, grid[best] + step)
+
+    @abc.abstractmethod
+    def maximize(self, f):
+        """
+        (best price, its revenue) of f over [lo, hi].
+        """
+
+    def stats(self):
+        return {"calls": self.calls, "evals": self.evals}
+
+
+class GridSearch(PriceSearch):
+    def __init__(self, n=100, lo=PRICE_MIN, hi=PRICE_MAX):
+        PriceSearch.__init__(self, lo, hi)
+        self.grid = np.linspace(lo, hi, n)
+
+    def maximize(self, f):
+        values = self._eval(f, self.grid)
+        best = int(np.argmax(values))
+        return self.grid[best], values[best]
+
+
+class CoarseToFine(PriceSearch):
+    def __init__(self, coarse=16, refine=8, rounds=3, lo=PRICE_MIN, hi=PRICE_MAX):
+        PriceSearch.__init__(self, lo, hi)
+        self.coarse = coarse
+        self.refine = refine
+        self.rounds = rounds
+
+    def maximize(self, f):
+        best_p, best_v, a, b = self._coarse(f, self.coarse)
+        for _ in range(self.rounds):
+            grid = np.linspace(a, b, self.refine + 2)[1:-1]
+            values = self._eval(f, grid)
+            i = int(np.argmax(values))
+            if values[i] > best_v:
+                best_p, best_v = grid[i], values[i]
+            step = (b - a) / (self.refine + 1)
+            a, b = max(self.lo, best_p - step), min(self.hi, best_p + step)
+        return best_p, best_v
+
+
+class GoldenSection(PriceSearch):
+    def __init__(self, coarse=12, steps=20, lo=PRICE_MIN, hi=PRICE_MAX):
+        PriceSearch.__init__(self, lo, hi)
+        self.coarse = coarse
+        self.steps = steps
+
+    def maximize(self, f):
+        best_p, best_v, a, b = self._coarse(f, self.coarse)
+        c = b - INV_PHI * (b - a)
+        d = a + INV_PHI * (b - a)
+        fc, fd = self._eval(f, [c, d])
+        for _ in range(self.steps):
+            if fc > fd:
+                b, d, fd = d, c, fc
+                c = b - INV_PHI * (b - a)
+                fc = self._eval(f, [c])[0]
+            else:
+                a, c, fc = c, d, fd
+                d = a + INV_PHI * (b - a)
+                fd = self._eval(f, [d])[0]
+        p, v = (c, fc) if fc > fd else (d, fd)
+        return (p, v) if v > best_v else (best_p, best_v)
+
+
+class FOCBisection(PriceSearch):
+    def __init__(self, coarse=12, steps=12, h=1e-3, lo=PRICE_MIN, hi=PRICE_MAX):
+        PriceSearch.__init__(self, lo, hi)
+        self.coarse = coarse
+        self.steps = steps
+        self.h = h
+
+    def maximize(self, f):
+        best_p, best_v, a, b = self._coarse(f, self.coarse)
+        for _ in range(self.steps):
+            m = 0.5 * (a + b)
+            left, right = self._eval(f, [m - self.h, m + self.h])
+            if right > left:  # revenue still rising: the optimum is to the right
+                a = m
+            else:
+                b = m
+        p = 0.5 * (a + b)
+        v = self._eval(f, [p])[0]
+        return (p, v) if v > best_v else (best_p, best_v)
+
+
+class BreakpointSearch(PriceSearch):
+    def __init__(self, fallback=None, lo=PRICE_MIN, hi=PRICE_MAX):
+        PriceSearch.__init__(self, lo, hi)
+        self.fallback = fallback if fallback is not None else CoarseToFine(lo=lo, hi=hi)
+
+    def maximize(self, f):
+        breakpoints = getattr(f, "breakpoints", None)
+        if breakpoints is None:
+            price, value = self.fallback.maximize(f)
+            self.calls, self.evals = self.fallback.calls, self.fallback.evals
+            return price, value
+        # trees compare float32(price) < threshold: the largest float32 below
+        # each threshold is the best price on the step that ends there
+        below = np.nextafter(np.asarray(breakpoints, dtype=np.float32), np.float32(-np.inf)).astype(float)
+        candidates = np.concatenate([[self.lo, self.hi], below[(below > self.lo) & (below < self.hi)]])
+        values = self._eval(f, candidates)
+        best = int(np.argmax(values))
+        return candidates[best], values[best]
+
+
+PRICE_SEARCHES = {
+    "grid": GridSearch,
+    "coarse_to_fine": CoarseToFine,
+    "golden": GoldenSection,
+    "foc_bisection": FOCBisection,
+    "breakpoints": BreakpointSearch,
+    "auto": BreakpointSearch,
+}
+
+
+def make_price_search(name="grid", **kwargs):
+    """
+    Price optimizer by name; kwargs set its evaluation budget (see the classes).
+    """
+    return PRICE_SEARCHES[name](**kwargs)
@@ -0,0 +1,329 @@
+"""
+Process-isolated agent hosting.
+
+Each agent loaded by agents.load runs in its own long-lived subprocess and is
+driven over a multiprocessing Pipe. The host enforces a per-action deadline:
+if the reply does not arrive in time (or the agent raises, or its process
+dies) the configured fallback price is posted instead and the simulation
+carries on. Late replies are recognised by their sequence number and dropped.
+A worker that falls behind (one slow action while the host keeps sending)
+runs only the newest queued action, and skips it too once its deadline has
+passed, so stale observations never reach the agent and the next request is
+served on time.
+
+A worker that dies is respawned in the background: action() posts the
+fallback at once and only checks, without blocking, whether the new worker
+has finished initialising. A worker that cannot come back is retried after
+RESTART_BACKOFF seconds.
+
+Workers stay warm: the agent module (and the model pickles it loads at import
+time) is imported once per worker, and a new episode or seat only builds a
+fresh Agent instance inside the existing process.
+
+    host = AgentHost(deadline=0.5, fallback_price=999.0)
+    env, agents = make_env.make_env_agents(names, project_part=2, host=host, ...)
+    ...
+    host.close()
+"""
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEADLINE = 0.5
+FALLBACK_PRICE = 999.0
+LOAD_TIMEOUT = 300.0
+RESTART_BACKOFF = 5.0
+
+
+def _worker(conn, name, cwd):
+    os.chdir(cwd)
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+    try:
+        import agents
+        module = agents.load(name + ".py")
+    except Exception:
+        conn.send(("load_error", None, traceback.format_exc()))
+        return
+
+    agent = None
+    while True:
+        try:
+            msg = conn.recv()
+            # only the newest of several queued actions is still wanted
+            while msg[0] == "action" and conn.poll():
+                msg = conn.recv()
+        except EOFError:
+            return
+        kind, seq, payload = msg
+        if kind == "init":
+            try:
+                agent_number, params = payload
+                agent = module.Agent(agent_number, params)
+                reply = ("ready", seq, None)
+            except Exception:
+                reply = ("error", seq, traceback.format_exc())
+        elif kind == "action":
+            obs, deadline = payload
+            if time.monotonic() > deadline:
+                continue
+            try:
+                reply = ("price", seq, float(agent.action(obs)))
+            except Exception:
+                reply = ("error", seq, traceback.format_exc())
+        elif kind == "close":
+            return
+        else:
+            continue
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            return
+
+
+class SandboxedAgent(object):
+    def __init__(self, name, ctx, deadline=DEADLINE, fallback_price=FALLBACK_PRICE,
+                 load_timeout=LOAD_TIMEOUT, cwd=REPO_DIR):
+        self.name = name
+        self.ctx = ctx
+        self.deadline = deadline
+        self.fallback_price = fallback_price
+        self.load_timeout = load_timeout
+        self.cwd = cwd
+
+        self.process = None
+        self.conn = None
+        self.seq = 0
+        self.agent_number = None
+        self.params = None
+
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.restarts = 0
+        self.last_error = None
+        # background respawn: seq and start time of the init in flight, retry time after a failure
+        self.pending_init = None
+        self.pending_since = None
+        self.retry_at = None
+
+    # ------------------------------------------------------------
+    # worker lifecycle
+    # ------------------------------------------------------------
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker, args=(child_conn, self.name, self.cwd), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def _request(self, kind, payload, timeout):
+        """
+        Send one request and wait up to `timeout` seconds for its reply.
+        Actions carry their deadline (time.monotonic, shared by the processes)
+        so the worker can skip them once they are too late.
+        Returns the reply, or None on timeout. Raises EOFError/OSError if the
+        worker is gone.
+        """
+        self.seq += 1
+        seq = self.seq
+        end = time.monotonic() + timeout
+        if kind == "action":
+            payload = (payload, end)
+        self.conn.send((kind, seq, payload))
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                return None
+            reply_kind, reply_seq, reply = self.conn.recv()
+            if reply_kind == "load_error":
+                raise RuntimeError("agent {} failed to load:\n{}".format(self.name, reply))
+            if reply_seq == seq:
+                return reply_kind, reply
+            # a late reply to a request that already timed out
+
+    def init(self, agent_number, params):
+        """
+        Build a fresh Agent instance in the (warm) worker, starting it if needed.
+        """
+        self.agent_number, self.params = agent_number, params
+        self.pending_init = None
+        if not self.is_alive() or self.conn is None:
+            self.start()
+        reply = self._request("init", (agent_number, params), self.load_timeout)
+        if reply is None:
+            raise RuntimeError("agent {} did not initialise within {} s".format(self.name, self.load_timeout))
+        if reply[0] == "error":
+            raise RuntimeError("agent {} failed to initialise:\n{}".format(self.name, reply[1]))
+
+    def restart(self):
+        self.close()
+        self.restarts += 1
+        self.init(self.agent_number, self.params)
+
+    def reset(self):
+        self.init(self.agent_number, self.params)
+
+    def kill(self):
+        """
+        Stop the worker at once, without asking it to finish.
+        """
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None and self.process.pid is not None:
+            self.process.kill()
+            self.process.join()
+        self.process = None
+        self.pending_init = None
+
+    def close(self):
+        self.pending_init = None
+        if self.conn is not None:
+            try:
+                self.conn.send(("close", 0, None))
+            except (OSError, EOFError):
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None and self.process.pid is not None:
+            self.process.join(timeout=1.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.process = None
+
+    # ------------------------------------------------------------
+    # agent interface
+    # ------------------------------------------------------------
+    def _begin_restart(self):
+        """
+        Respawn the worker and send its init without waiting for the reply.
+        """
+        self.kill()
+        self.restarts += 1
+        self.retry_at = None
+        try:
+            self.start()
+            self.seq += 1
+            self.conn.send(("init", self.seq, (self.agent_number, self.params)))
+        except (EOFError, OSError) as exc:
+            self._restart_failed("restart failed: {}".format(exc))
+            return
+        self.pending_init = self.seq
+        self.pending_since = time.monotonic()
+
+    def _restart_failed(self, error):
+        self.last_error = error
+        self.kill()
+        self.retry_at = time.monotonic() + RESTART_BACKOFF
+
+    def _poll_restart(self):
+        """
+        True once the respawned worker has initialised; never blocks.
+        """
+        try:
+            while self.conn.poll(0):
+                kind, seq, reply = self.conn.recv()
+                if kind == "load_error":
+                    self._restart_failed("agent {} failed to load:\n{}".format(self.name, reply))
+                    return False
+                if seq == self.pending_init:
+                    if kind == "error":
+                        self._restart_failed("agent {} failed to initialise:\n{}".format(self.name, reply))
+                        return False
+                    self.pending_init = None
+                    return True
+        except (EOFError, OSError):
+            self._restart_failed("worker process died during restart")
+            return False
+        if time.monotonic() - self.pending_since > self.load_timeout:
+            self._restart_failed("agent {} did not initialise within {} s".format(self.name, self.load_timeout))
+        return False
+
+    def action(self, obs):
+        self.calls += 1
+        if self.conn is None:
+            # the worker is gone: respawn in the background, post the fallback meanwhile
+            self.errors += 1
+            if self.retry_at is None or time.monotonic() >= self.retry_at:
+                self._begin_restart()
+            return self.fallback_price
+        if self.pending_init is not None and not self._poll_restart():
+            self.errors += 1
+            return self.fallback_price
+        try:
+            reply = self._request("action", obs, self.deadline)
+        except (EOFError, OSError):
+            self.errors += 1
+            self.last_error = "worker process died"
+            self._begin_restart()
+            return self.fallback_price
+
+        if reply is None:
+            self.timeouts += 1
+            return self.fallback_price
+        kind, value = reply
+        if kind == "error":
+            self.errors += 1
+            self.last_error = value
+            return self.fallback_price
+        return value
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
+
+
+class AgentHost(object):
+    """
+    Owns one warm worker per (seat, agent name) and hands out SandboxedAgents.
+    """
+    def __init__(self, deadline=DEADLINE, fallback_price=FALLBACK_PRICE,
+                 load_timeout=LOAD_TIMEOUT, start_method="spawn"):
+        self.deadline = deadline
+        self.fallback_price = fallback_price
+        self.load_timeout = load_timeout
+        self.ctx = multiprocessing.get_context(start_method)
+        self.workers = {}
+
+    def make_agents(self, agentnames, params):
+        agents = []
+        for agent_number, name in enumerate(agentnames):
+            worker = self.workers.get((agent_number, name))
+            if worker is None:
+                worker = SandboxedAgent(name, self.ctx, self.deadline, self.fallback_price, self.load_timeout)
+                self.workers[(agent_number, name)] = worker
+            worker.init(agent_number, params)
+            agents.append(worker)
+        return agents
+
+    def stats(self):
+        return [worker.stats() for worker in self.workers.values()]
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+        self.workers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,39 @@
+"""
+Customer segments shared by the 8-segment demand models.
+
+A customer falls in segment (a, b, c) with a = C1 > t1, b = C2 > t2 and
+c = C3 > t3 (the covariate medians of the training data). Model dicts are
+keyed by that tuple; array-backed models use row 4a + 2b + c.
+"""
+import itertools
+
+import numpy as np
+
+SEGMENT_THRESHOLDS = np.array([2.7193025761078644, 2.7215555543935457, 7.262601783583493])
+SEGMENT_KEYS = list(itertools.product((0, 1), repeat=3))
+
+_T1, _T2, _T3 = (float(t) for t in SEGMENT_THRESHOLDS)
+
+
+def segment_key(C1, C2, C3):
+    return (int(C1 > _T1), int(C2 > _T2), int(C3 > _T3))
+
+
+def segment_row(key):
+    """
+    Row of segment key (a, b, c), bools or ints, in SEGMENT_KEYS order.
+    """
+    a, b, c = key
+    return 4 * int(a) + 2 * int(b) + int(c)
+
+
+def segment_rows(covariates, thresholds=SEGMENT_THRESHOLDS, inclusive=False):
+    """
+    Segment row of every customer in covariates[n, 3]. A model set trained on
+    other cut points passes its own thresholds, and inclusive=True for a
+    C >= t split (as 8_xgb.ipynb trains with).
+    """
+    covariates = np.asarray(covariates, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)
+    above = covariates >= thresholds if inclusive else covariates > thresholds
+    return above @ np.array([4, 2, 1])
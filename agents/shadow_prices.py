@@ -0,0 +1,125 @@
+"""
+Shadow prices of inventory from the sell-or-hold DP of alice_2, per segment.
+
+For a sale probability q, with i units left and k customers left in the
+replenishment cycle:
+
+    V[i, k] = max(q * (1 + V[i - 1, k - 1]) + (1 - q) * V[i, k - 1],  V[i, k - 1])
+    lambda[i, k] = V[i, k] - V[i - 1, k]
+
+V counts the expected number of units sold, and lambda is the marginal value
+of one more unit. Agents scale it into price space. shadow_tables() fills
+one time slice k for every inventory level and every q at once.
+
+q is no longer a constant: it is the probability that a customer of a
+segment buys at their revenue-maximising price, averaged over the customers
+seen so far (observe()). (V, lambda) tables are cached by (inventory limit,
+replenish period, segment). segment=None is the customer mix, the q averaged over the
+observed segment shares. refresh() folds the new observations in and drops
+the cache, so an agent can rebuild its tables every replenishment cycle;
+one fill of all segments takes well under a millisecond:
+
+    shadow = ShadowPrices(PRICE_GRID)
+    shadow.observe(segment_key(C1, C2, C3), probs)       # P(buy) over PRICE_GRID
+    shadow.refresh()                                    # at replenishment
+    lam = shadow.shadow_price(inventory, time_until_replenish, limit, 20, segment_key(C1, C2, C3))
+"""
+import numpy as np
+
+from agents.segments import SEGMENT_KEYS, segment_row
+
+DEFAULT_SALE_PROB = 0.4
+
+
+def shadow_tables(sale_probs, inventory_limit, replenish):
+    """
+    (V, lambdas), both [len(sale_probs), inventory_limit + 1, replenish + 1]:
+    the DP above for every sale probability in sale_probs.
+    """
+    q = np.atleast_1d(np.asarray(sale_probs, dtype=float))[:, None]
+    V = np.zeros((q.shape[0], inventory_limit + 1, replenish + 1))
+    for k in range(1, replenish + 1):
+        prev = V[:, :, k - 1]
+        offer = q * (1.0 + prev[:, :-1]) + (1.0 - q) * prev[:, 1:]
+        V[:, 1:, k] = np.maximum(offer, prev[:, 1:])
+    lambdas = np.zeros_like(V)
+    lambdas[:, 1:] = V[:, 1:] - V[:, :-1]
+    return V, lambdas
+
+
+def sale_probability(probs, price_grid):
+    """
+    P(buy) at the revenue-maximising grid price, for probs[m] or probs[n, m].
+    """
+    probs = np.asarray(probs, dtype=float)
+    best = np.argmax(probs * price_grid, axis=-1)
+    return np.take_along_axis(probs, np.expand_dims(best, -1), axis=-1)[..., 0]
+
+
+class ShadowPrices(object):
+    """
+    Cached V and lambda tables for the 8 segments and their mix.
+    """
+    def __init__(self, price_grid, default_prob=DEFAULT_SALE_PROB):
+        self.price_grid = np.asarray(price_grid, dtype=float)
+        self.default_prob = default_prob
+        self.sale_probs = np.full(len(SEGMENT_KEYS), float(default_prob))
+        self.mix_prob = float(default_prob)
+        self._sums = np.zeros(len(SEGMENT_KEYS))
+        self._counts = np.zeros(len(SEGMENT_KEYS))
+        self._tables = {}
+
+    def observe(self, key, probs):
+        """
+        Record a customer of segment key with purchase curve probs over price_grid.
+        """
+        row = segment_row(key)
+        self._sums[row] += float(sale_probability(probs, self.price_grid))
+        self._counts[row] += 1
+
+    def refresh(self):
+        """
+        Fold the observations into the sale probabilities; True if they changed
+        (the cached tables are dropped then).
+        """
+        seen = self._counts > 0
+        if not seen.any():
+            return False
+        sale_probs = np.where(seen, self._sums / np.maximum(self._counts, 1), self.default_prob)
+        mix_prob = float(self._sums.sum() / self._counts.sum())
+        if np.array_equal(sale_probs, self.sale_probs) and mix_prob == self.mix_prob:
+            return False
+        self.sale_probs = sale_probs
+        self.mix_prob = mix_prob
+        self._tables.clear()
+        return True
+
+    def tables(self, inventory_limit, replenish, segment=None):
+        """
+        (V[i, k], lambda[i, k]) for segment key `segment` (None: the customer mix).
+        A miss fills the tables of every segment and the mix at once.
+        """
+        key = (inventory_limit, replenish, segment)
+        found = self._tables.get(key)
+        if found is None:
+            V, lambdas = shadow_tables(np.append(self.sale_probs, self.mix_prob), inventory_limit, replenish)
+            for row, seg in enumerate(SEGMENT_KEYS):
+                self._tables[(inventory_limit, replenish, seg)] = (V[row], lambdas[row])
+            self._tables[(inventory_limit, replenish, None)] = (V[-1], lambdas[-1])
+            found = self._tables[key]
+        return found
+
+    def table(self, inventory_limit, replenish, segment=None):
+        """
+        lambda[i, k] for segment key `segment` (None: the customer mix).
+        """
+        return self.tables(inventory_limit, replenish, segment)[1]
+
+    def shadow_price(self, inventory, time_left, inventory_limit, replenish, segment=None):
+        """
+        lambda at (inventory, time_left), both clamped to the table.
+        """
+        lambdas = self.table(inventory_limit, replenish, segment)
+        i = int(max(0, min(inventory, inventory_limit)))
+        k = int(max(0, min(time_left, replenish)))
+        return lambdas[i, k]
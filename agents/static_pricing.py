@@ -0,0 +1,158 @@
+"""
+Static (one price per user) submission for the test users, in batch.
+
+Streams the test CSV in chunks. Every chunk is routed to segments at once
+(segments.segment_rows), scored across the price grid in one
+DemandModel.predict_grid call per chunk, and reduced to the revenue-maximising
+price per user. Chunks fan out over a process pool and are written to the
+submission in input order as they finish, so memory stays bounded by a few
+chunks whatever the input size.
+
+    python -m agents.static_pricing --test_file data/test_user_info_2025.csv \
+        --out agents/static_prices_submission.csv --workers 4
+
+As in 8_xgb.ipynb, users whose segment has no model are left out of the
+submission. Users are routed with the split the models were trained on: the
+notebook passes its training medians and a C >= t split to static_prices(),
+and the CLI does the same by default (medians of --train_file, see
+training_split()), so both write the same CSV. --thresholds and
+--exclusive select another split.
+"""
+import argparse
+import collections
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from agents.demand_model import BACKENDS, load_demand_model
+from agents.segments import SEGMENT_KEYS, SEGMENT_THRESHOLDS, segment_rows
+
+PRICE_GRID = np.linspace(0.01, 500, 100)
+CHUNK_ROWS = 8192
+COVARIATES = ["Covariate1", "Covariate2", "Covariate3"]
+OUTPUT_COLUMNS = ["user_index", "price_item", "expected_revenue"]
+
+_worker = {}
+
+
+def static_prices(demand, users, price_grid=PRICE_GRID, thresholds=SEGMENT_THRESHOLDS, inclusive=False):
+    """
+    Best static price and its expected revenue for every user of `users`
+    (a DataFrame with user_index and Covariate1-3) that has a segment model.
+    Users are routed with the split the models were trained on: thresholds
+    and inclusive as in segments.segment_rows.
+    """
+    covariates = users[COVARIATES].to_numpy(np.float64)
+    rows = segment_rows(covariates, thresholds, inclusive)
+    modelled = np.array([demand.has_segment(key) for key in SEGMENT_KEYS])
+    keep = modelled[rows]
+    covariates, rows = covariates[keep], rows[keep]
+
+    price_grid = np.asarray(price_grid, dtype=float)
+    revenue = demand.backend.predict_grid(rows, covariates, price_grid) * price_grid
+    best = revenue.argmax(axis=1)
+    return pd.DataFrame({
+        "user_index": users["user_index"].to_numpy()[keep],
+        "price_item": price_grid[best],
+        "expected_revenue": revenue[np.arange(best.size), best],
+    }, columns=OUTPUT_COLUMNS)
+
+
+def training_split(train_file):
+    """
+    (thresholds, inclusive) of 8_xgb.ipynb: the training covariate medians, C >= median.
+    """
+    return pd.read_csv(train_file, usecols=COVARIATES)[COVARIATES].median().to_numpy(np.float64), True
+
+
+def _init_worker(kind, price_grid, thresholds, inclusive):
+    _worker["demand"] = load_demand_model(kind)
+    _worker["price_grid"] = price_grid
+    _worker["split"] = (thresholds, inclusive)
+
+
+def _price_chunk(users):
+    return static_prices(_worker["demand"], users, _worker["price_grid"], *_worker["split"])
+
+
+def _ordered(chunks, workers, kind, price_grid, thresholds=SEGMENT_THRESHOLDS, inclusive=False):
+    """
+    Priced chunks in input order; at most 2 * workers chunks in flight.
+    """
+    if workers <= 1:
+        demand = load_demand_model(kind)
+        for users in chunks:
+            yield static_prices(demand, users, price_grid, thresholds, inclusive)
+        return
+    initargs = (kind, price_grid, thresholds, inclusive)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = collections.deque()
+        for users in chunks:
+            pending.append(pool.submit(_price_chunk, users))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_submission(test_file, out, kind="xgb", workers=1, chunk_rows=CHUNK_ROWS, price_grid=PRICE_GRID,
+                     thresholds=SEGMENT_THRESHOLDS, inclusive=False):
+    """
+    Price every user of test_file and write the submission CSV to out, routing
+    users with (thresholds, inclusive) as in static_prices().
+    Returns (users read, users priced, total expected revenue).
+    """
+    n_read = [0]
+
+    def chunks():
+        for users in pd.read_csv(test_file, chunksize=chunk_rows):
+            n_read[0] += len(users)
+            yield users
+
+    n_priced = 0
+    total = 0.0
+    tmp = out + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        f.write(",".join(OUTPUT_COLUMNS) + "\n")
+        for priced in _ordered(chunks(), workers, kind, price_grid, thresholds, inclusive):
+            priced.to_csv(f, header=False, index=False)
+            n_priced += len(priced)
+            total += float(priced["expected_revenue"].sum())
+    os.replace(tmp, out)
+    return n_read[0], n_priced, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch static prices for the test users.")
+    parser.add_argument("--test_file", default="data/test_user_info_2025.csv")
+    parser.add_argument("--out", default="static_prices_submission.csv")
+    parser.add_argument("--kind", choices=sorted(BACKENDS), default="xgb")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk_rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--train_file", default="data/train_prices_decisions_2025.csv",
+                        help="segment at the medians of this file, as 8_xgb.ipynb trains")
+    parser.add_argument("--thresholds", type=float, nargs=3, default=None,
+                        help="segment at these thresholds instead of the --train_file medians")
+    parser.add_argument("--exclusive", action="store_true",
+                        help="C > t split (segments.segment_rows) instead of the notebook's C >= t")
+    args = parser.parse_args(argv)
+
+    if args.thresholds is None:
+        thresholds, inclusive = training_split(args.train_file)
+    else:
+        thresholds, inclusive = np.array(args.thresholds), True
+    inclusive = inclusive and not args.exclusive
+
+    start = time.perf_counter()
+    n_read, n_priced, total = write_submission(
+        args.test_file, args.out, args.kind, args.workers, args.chunk_rows,
+        thresholds=thresholds, inclusive=inclusive)
+    print("{} users read, {} priced, expected revenue {:.2f} -> {} ({:.2f}s)".format(
+        n_read, n_priced, total, args.out, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
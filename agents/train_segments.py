@@ -0,0 +1,181 @@
+"""
+Retrain the 8 segment demand models from the training CSV in one command.
+
+Rows are assigned to segments with segments.segment_rows, a vectorized
+comparison against the same thresholds the agents route with. The segments
+are then fitted in parallel: a process pool runs up to `--cores` fits at
+once, and each fit gets cores // workers threads. The {segment key: model}
+pickle is written atomically where the agents load it, and a timing report
+is printed and saved next to it:
+
+    python -m agents.train_segments --kind xgb --cores 8
+    python -m agents.train_segments --kind logistic --out /tmp/8_models_dict.pkl
+
+Model settings are those of 8_xgb.ipynb and, for the logistic models, the
+parameters stored in the shipped 8_models_dict.pkl (sklearn's lbfgs, C=1.0,
+max_iter=100), pinned in LOGISTIC_PARAMS so the same data gives the same
+models whatever the installed sklearn defaults are. A binary lbfgs fit is
+single-threaded, so logistic fits get one thread each and the pool spreads
+the cores over segments only. The thresholds are
+the medians of the original training data; the report flags a refreshed
+dataset whose medians have moved away from them.
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from agents.model_registry import PACKAGE_DIR
+from agents.segments import SEGMENT_KEYS, SEGMENT_THRESHOLDS, segment_rows
+
+COVARIATES = ["Covariate1", "Covariate2", "Covariate3"]
+PRICE = "price_item"
+TARGET = "item_bought"
+MIN_SEGMENT_ROWS = 50
+
+XGB_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "logloss",
+    "n_estimators": 350,
+    "learning_rate": 0.2,
+    "random_state": 42,
+    "tree_method": "hist",
+}
+
+LOGISTIC_PARAMS = {
+    "penalty": "l2",
+    "C": 1.0,
+    "solver": "lbfgs",
+    "max_iter": 100,
+    "tol": 1e-4,
+}
+
+
+def _make_xgb(threads):
+    from xgboost import XGBClassifier
+    return XGBClassifier(n_jobs=threads, **XGB_PARAMS)
+
+
+def _make_logistic():
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(**LOGISTIC_PARAMS)
+
+
+# kind -> (model file, feature columns in model order, estimator factory, factory takes a thread count)
+MODEL_SPECS = {
+    "xgb": ("8_xgb.pkl", [PRICE] + COVARIATES, _make_xgb, True),
+    "logistic": ("8_models_dict.pkl", COVARIATES + [PRICE], _make_logistic, False),
+}
+
+
+def segment_data(train, columns):
+    """
+    {segment key: (X, y)} from the training frame, X in `columns` order.
+    """
+    X = train[columns].to_numpy(np.float64)
+    y = train[TARGET].to_numpy().astype(np.int64)
+    rows = segment_rows(train[COVARIATES].to_numpy(np.float64))
+    order = np.argsort(rows, kind="stable")
+    bounds = np.searchsorted(rows[order], np.arange(len(SEGMENT_KEYS) + 1))
+    return {key: (X[order[bounds[i]:bounds[i + 1]]], y[order[bounds[i]:bounds[i + 1]]])
+            for i, key in enumerate(SEGMENT_KEYS)}
+
+
+def _fit(kind, key, X, y, threads):
+    start = time.perf_counter()
+    _, _, factory, threaded = MODEL_SPECS[kind]
+    model = factory(threads) if threaded else factory()
+    model.fit(X, y)
+    return key, model, time.perf_counter() - start
+
+
+def train_segments(train, kind="xgb", cores=1):
+    """
+    Fit one model per segment with at least MIN_SEGMENT_ROWS rows.
+    Returns ({segment key: model}, report dict).
+    """
+    start = time.perf_counter()
+    data = segment_data(train, MODEL_SPECS[kind][1])
+    segment_time = time.perf_counter() - start
+
+    jobs = [(key, X, y) for key, (X, y) in data.items() if len(y) >= MIN_SEGMENT_ROWS]
+    workers = max(1, min(cores, len(jobs)))
+    threads = max(1, cores // workers) if MODEL_SPECS[kind][3] else 1
+    models, fit_seconds = {}, {}
+    if workers == 1:
+        fitted = [_fit(kind, key, X, y, threads) for key, X, y in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_fit, kind, key, X, y, threads) for key, X, y in jobs]
+            fitted = [future.result() for future in futures]
+    for key, model, seconds in fitted:
+        models[key] = model
+        fit_seconds[key] = seconds
+
+    report = {
+        "kind": kind,
+        "rows": int(len(train)),
+        "cores": cores,
+        "workers": workers,
+        "threads_per_fit": threads,
+        "segment_seconds": segment_time,
+        "fit_seconds_sum": sum(fit_seconds.values()),
+        "wall_seconds": time.perf_counter() - start,
+        "training_medians": train[COVARIATES].median().tolist(),
+        "segment_thresholds": SEGMENT_THRESHOLDS.tolist(),
+        "thresholds_match_medians": bool(np.allclose(train[COVARIATES].median(), SEGMENT_THRESHOLDS, rtol=1e-3)),
+        "segments": {
+            "".join(str(v) for v in key): {
+                "rows": int(len(data[key][1])),
+                "fit_seconds": fit_seconds.get(key),
+            } for key in SEGMENT_KEYS
+        },
+    }
+    return models, report
+
+
+def write_models(models, path):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(models, f)
+    os.replace(tmp, path)
+
+
+def print_report(report, out):
+    print("{} models from {} rows -> {}".format(report["kind"], report["rows"], out))
+    print("{:<8s} {:>8s} {:>10s}".format("segment", "rows", "fit s"))
+    for key, seg in report["segments"].items():
+        seconds = "skipped" if seg["fit_seconds"] is None else "{:.2f}".format(seg["fit_seconds"])
+        print("{:<8s} {:>8d} {:>10s}".format(key, seg["rows"], seconds))
+    print("segmentation {:.3f}s, fits {:.2f}s summed, {:.2f}s wall ({} workers x {} threads)".format(
+        report["segment_seconds"], report["fit_seconds_sum"], report["wall_seconds"],
+        report["workers"], report["threads_per_fit"]))
+    if not report["thresholds_match_medians"]:
+        print("note: training medians {} differ from segments.SEGMENT_THRESHOLDS {}".format(
+            np.round(report["training_medians"], 4).tolist(), np.round(report["segment_thresholds"], 4).tolist()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the 8 segment demand models in parallel.")
+    parser.add_argument("--train_file", default="data/train_prices_decisions_2025.csv")
+    parser.add_argument("--kind", choices=sorted(MODEL_SPECS), default="xgb")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=None, help="model pickle (default: the file the agents load)")
+    parser.add_argument("--report", default=None, help="timing report JSON (default: <out>.timing.json)")
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.join(PACKAGE_DIR, "dealmakers", MODEL_SPECS[args.kind][0])
+    models, report = train_segments(pd.read_csv(args.train_file), args.kind, args.cores)
+    write_models(models, out)
+    with open(args.report or out + ".timing.json", "w") as f:
+        json.dump(report, f, indent=1)
+    print_report(report, out)
+
+
+if __name__ == "__main__":
+    main()
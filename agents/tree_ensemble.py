@@ -0,0 +1,350 @@
+"""
+NumPy evaluator for the 8-segment XGBoost purchase models.
+
+compile_xgb() reads a fitted XGBClassifier's trees once (through the booster's
+JSON dump) into flat arrays and TreeEnsemble scores rows without xgboost:
+
+  - leaves() is a level-by-level traversal: every (row, tree) pair moves one
+    level down per step, all pairs at once, for max_depth steps. It handles
+    any depth and NaN inputs.
+  - exit_leaves() is the fast path for trees of depth <= 6 (the models are
+    trained with the default max_depth=6). Each tree's leaves fit in a uint64
+    bitmask. For each feature, a table holds the running AND of the masks of
+    the nodes that send a row right, taken in threshold order. A row's exit
+    leaf is then the lowest set bit of one table lookup per feature.
+    This is the QuickScorer idea, with one searchsorted per feature.
+  - predict_grid_positive() scores customers across a shared price grid.
+    The lookups of the covariate columns are done once per customer, and those
+    of the price column once per grid price. A tree's covariate masks take
+    only a few distinct values across customers, so each distinct (tree, mask)
+    gets its leaf values along the grid once. A customer's curve is then a
+    sum of one such row per tree.
+
+TreeEnsemble.predict_proba() has the same shape as the sklearn method, so it
+is a drop-in replacement for the per-decision calls in the agents:
+
+    from agents.model_registry import get_model
+    from agents.tree_ensemble import load_xgb_ensembles
+
+    ensembles = get_model('8_xgb.pkl', load_xgb_ensembles)
+    probs = ensembles[key].predict_proba(X)[:, 1]
+
+Like XGBoost, inputs and thresholds are compared in float32, and NaN follows
+each split's default direction.
+"""
+import json
+import pickle
+
+import numpy as np
+
+SIGMOID_OBJECTIVES = ("binary:logistic", "reg:logistic")
+
+# exit_leaves() keeps one bit per leaf in a uint64
+MASK_DEPTH = 6
+# (row, tree) pairs scored at once; bounds the temporaries of large inputs
+BLOCK_PAIRS = 1 << 22
+# below this many rows predict_grid_positive() scores the expanded rows directly
+GRID_MIN_ROWS = 4
+
+
+def _base_margin(learner):
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    objective = learner["objective"]["name"]
+    if objective not in SIGMOID_OBJECTIVES:
+        raise ValueError("unsupported XGBoost objective {!r}".format(objective))
+    # base_score is stored as a probability; trees add to its logit
+    return float(np.log(base_score / (1.0 - base_score)))
+
+
+def _tree_depth(children_l, children_r):
+    depth = 0
+    todo = [(0, 0)]
+    while todo:
+        node, d = todo.pop()
+        if children_l[node] < 0:
+            depth = max(depth, d)
+        else:
+            todo.append((children_l[node], d + 1))
+            todo.append((children_r[node], d + 1))
+    return depth
+
+
+def _n_trees_used(model, booster_model):
+    """
+    Number of leading trees predict_proba uses (all of them, unless the model
+    was fitted with early stopping).
+    """
+    try:
+        best_iteration = model.best_iteration
+    except AttributeError:
+        return len(booster_model["trees"])
+    return int(booster_model["iteration_indptr"][best_iteration + 1])
+
+
+class TreeEnsemble(object):
+    """
+    Every tree is stored as a perfect binary tree of depth max_depth, so the
+    children of position p are always 2p+1 and 2p+2 and one level of
+    traversal is two gathers and a compare. Leaves that XGBoost placed higher
+    up are pushed down: the padding nodes below them always branch left (an
+    infinite threshold) and the leaf value is copied to the bottom level.
+
+      feature[T, 2^D - 1]       split feature of every internal position
+      threshold[T, 2^D - 1]     float32 split threshold (go left when x < threshold)
+      default_left[T, 2^D - 1]  direction taken when the feature is NaN
+      leaf_value[T, 2^D]        leaf value at every bottom-level position
+    """
+    def __init__(self, feature, threshold, default_left, leaf_value, base_margin):
+        self.feature = feature
+        self.threshold = threshold
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.base_margin = base_margin
+        self.n_trees, n_internal = feature.shape
+        self.max_depth = int(np.log2(n_internal + 1))
+        # flat views; per-tree offsets are added once per call
+        self._feature = feature.ravel()
+        self._threshold = threshold.ravel()
+        self._default_left = default_left.ravel()
+        self._leaf_value = leaf_value.ravel()
+        self._tree_offset = np.arange(self.n_trees, dtype=np.intp) * n_internal
+        self._leaf_offset = np.arange(self.n_trees, dtype=np.intp) * leaf_value.shape[1]
+        self.masks = self._build_masks() if self.max_depth <= MASK_DEPTH else None
+
+    def _build_masks(self):
+        """
+        Per split feature f: (sorted distinct thresholds u, table) where
+        table[k, t] is the bitmask of tree t's leaves still reachable once
+        every node on f with threshold <= u[k-1] has sent the row right.
+        """
+        n_internal = self.feature.shape[1]
+        pos = np.arange(n_internal)
+        depth = np.floor(np.log2(pos + 1)).astype(np.intp)
+        width = 2 ** (self.max_depth - depth)
+        first = (pos + 1) * width - 1 - n_internal
+        # going right at a node rules out the leaves of its left subtree
+        left_bits = ((np.uint64(1) << (width // 2).astype(np.uint64)) - np.uint64(1)) << first.astype(np.uint64)
+        node_mask = ~left_bits
+
+        real = np.isfinite(self.threshold)  # padding nodes never branch right
+        trees = np.broadcast_to(np.arange(self.n_trees)[:, None], self.feature.shape)
+        masks = {}
+        for f in np.unique(self.feature[real]):
+            on_f = real & (self.feature == f)
+            thresholds, rank = np.unique(self.threshold[on_f], return_inverse=True)
+            table = np.full((thresholds.size + 1, self.n_trees), ~np.uint64(0), dtype=np.uint64)
+            np.bitwise_and.at(table, (rank + 1, trees[on_f]), np.broadcast_to(node_mask, self.feature.shape)[on_f])
+            masks[int(f)] = (thresholds, np.bitwise_and.accumulate(table, axis=0))
+        return masks
+
+    @classmethod
+    def from_trees(cls, trees, base_margin):
+        """
+        Build from XGBoost JSON tree dicts (split_indices, split_conditions,
+        left_children, right_children, default_left).
+        """
+        max_depth = 0
+        for tree in trees:
+            max_depth = max(max_depth, _tree_depth(tree["left_children"], tree["right_children"]))
+        n_internal = 2 ** max_depth - 1
+
+        feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+        threshold = np.full((len(trees), n_internal), np.inf, dtype=np.float32)
+        default_left = np.ones((len(trees), n_internal), dtype=bool)
+        leaf_value = np.zeros((len(trees), n_internal + 1), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            children_l = tree["left_children"]
+            children_r = tree["right_children"]
+            # (xgboost node id, position in the perfect tree, depth)
+            todo = [(0, 0, 0)]
+            while todo:
+                node, pos, depth = todo.pop()
+                if children_l[node] < 0:
+                    # leaf: fill the bottom-level span under pos
+                    width = 2 ** (max_depth - depth)
+                    first = (pos + 1) * width - 1 - n_internal
+                    leaf_value[t, first:first + width] = tree["split_conditions"][node]
+                    continue
+                feature[t, pos] = tree["split_indices"][node]
+                threshold[t, pos] = tree["split_conditions"][node]
+                default_left[t, pos] = bool(tree["default_left"][node])
+                todo.append((children_l[node], 2 * pos + 1, depth + 1))
+                todo.append((children_r[node], 2 * pos + 2, depth + 1))
+
+        return cls(feature, threshold, default_left, leaf_value, base_margin)
+
+    def split_values(self, feature):
+        """
+        Sorted distinct float32 thresholds of all splits on `feature`.
+        """
+        real = np.isfinite(self.threshold) & (self.feature == feature)
+        return np.unique(self.threshold[real])
+
+    def leaves(self, X):
+        """
+        Flat leaf_value index reached by every row of X in every tree, shape (n_rows, n_trees).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        n_rows, n_features = X.shape
+        # column-major copy: feature f of row r lives at f * n_rows + r
+        columns = np.ascontiguousarray(X.T).ravel()
+        rows = np.arange(n_rows, dtype=np.intp)[:, None]
+        has_nan = bool(np.isnan(columns).any())
+
+        pos = np.zeros((n_rows, self.n_trees), dtype=np.intp)
+        for _ in range(self.max_depth):
+            node = pos + self._tree_offset
+            x = columns[self._feature[node] * n_rows + rows]
+            go_right = ~(x < self._threshold[node])
+            if has_nan:
+                missing = np.isnan(x)
+                go_right[missing] = ~self._default_left[node[missing]]
+            pos = 2 * pos + 1 + go_right
+        return pos - (2 ** self.max_depth - 1) + self._leaf_offset
+
+    def _reachable(self, X, skip=None):
+        """
+        AND of the mask-table lookups of every split feature of X except
+        `skip`, shape (n_rows, n_trees); all ones when there is none.
+        """
+        reachable = np.full((X.shape[0], self.n_trees), ~np.uint64(0), dtype=np.uint64)
+        for f, (thresholds, table) in self.masks.items():
+            if f != skip:
+                # nodes with threshold <= x send the row right
+                reachable &= table[np.searchsorted(thresholds, X[:, f], side="right")]
+        return reachable
+
+    @staticmethod
+    def _lowest_bit(reachable):
+        lowest = reachable & (~reachable + np.uint64(1))
+        return np.frexp(lowest.astype(np.float64))[1] - 1
+
+    def exit_leaves(self, X):
+        """
+        Same as leaves() for NaN-free X, via the per-feature mask tables.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        return self._lowest_bit(self._reachable(X)) + self._leaf_offset
+
+    def predict_margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        fast = self.masks is not None and not np.isnan(X).any()
+        out = np.empty(X.shape[0])
+        step = max(1, BLOCK_PAIRS // self.n_trees)
+        for start in range(0, X.shape[0], step):
+            block = X[start:start + step]
+            leaves = self.exit_leaves(block) if fast else self.leaves(block)
+            out[start:start + step] = self.base_margin + self._leaf_value[leaves].sum(axis=1)
+        return out
+
+    def predict_positive(self, X):
+        """
+        P(class 1) for every row of X, shape (n_rows,).
+        """
+        return 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+
+    def predict_grid_positive(self, X, grid, column=0):
+        """
+        P(class 1) of every row of X with feature `column` set to each value
+        of grid[m], shape (n_rows, m); X[:, column] itself is ignored.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        grid = np.asarray(grid, dtype=np.float32).ravel()
+        if X.shape[0] < GRID_MIN_ROWS or self.masks is None or np.isnan(X).any() or np.isnan(grid).any():
+            full = np.repeat(X, grid.size, axis=0)
+            full[:, column] = np.tile(grid, X.shape[0])
+            return self.predict_positive(full).reshape(X.shape[0], grid.size)
+
+        if column in self.masks:
+            thresholds, table = self.masks[column]
+            prices = table[np.searchsorted(thresholds, grid, side="right")]
+        else:
+            prices = np.full((grid.size, self.n_trees), ~np.uint64(0), dtype=np.uint64)
+
+        # distinct covariate masks of each tree; the sorted rows start a new
+        # id at every change and at every tree boundary
+        masks = self._reachable(X, skip=column).T
+        order = np.argsort(masks, axis=1, kind="stable")
+        ordered = np.take_along_axis(masks, order, axis=1)
+        new = np.ones(ordered.shape, dtype=bool)
+        new[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        ids = np.cumsum(new.ravel()).reshape(new.shape) - 1
+        inverse = np.empty(ids.shape, dtype=np.intp)
+        np.put_along_axis(inverse, order, ids, axis=1)
+        tree = np.broadcast_to(np.arange(self.n_trees)[:, None], new.shape)[new]
+
+        # curves[u, m]: leaf value of distinct mask u at grid price m
+        curves = self._lowest_bit(ordered[new][:, None] & prices.T[tree])
+        curves = self._leaf_value[curves + self._leaf_offset[tree][:, None]]
+
+        inverse = inverse.T
+        margin = np.empty((X.shape[0], grid.size))
+        step = max(1, BLOCK_PAIRS // (grid.size * self.n_trees))
+        for start in range(0, X.shape[0], step):
+            margin[start:start + step] = curves[inverse[start:start + step]].sum(axis=1)
+        return 1.0 / (1.0 + np.exp(-(self.base_margin + margin)))
+
+    def predict_proba(self, X, validate_features=True):
+        p = self.predict_positive(X)
+        return np.column_stack([1.0 - p, p])
+
+    def arrays(self):
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "default_left": self.default_left,
+            "leaf_value": self.leaf_value,
+            "base_margin": np.asarray(self.base_margin),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        # feature may be stored narrower; the traversal indexes with it
+        return cls(
+            np.asarray(arrays["feature"], dtype=np.intp), arrays["threshold"], arrays["default_left"],
+            arrays["leaf_value"], float(arrays["base_margin"]),
+        )
+
+
+def compile_xgb(model):
+    """
+    TreeEnsemble equivalent to a fitted binary XGBClassifier.
+    """
+    learner = json.loads(bytes(model.get_booster().save_raw(raw_format="json")))["learner"]
+    booster_model = learner["gradient_booster"]["model"]
+    trees = booster_model["trees"][:_n_trees_used(model, booster_model)]
+    return TreeEnsemble.from_trees(trees, _base_margin(learner))
+
+
+def compile_models(models):
+    """
+    Compile a {segment key: XGBClassifier} dict into {segment key: TreeEnsemble}.
+    """
+    return {key: compile_xgb(model) for key, model in models.items()}
+
+
+def load_xgb_ensembles(path):
+    """
+    model_registry loader: unpickle an 8_xgb.pkl-style dict and compile it.
+    """
+    with open(path, "rb") as f:
+        return compile_models(pickle.load(f))
+
+
+def max_abs_error(models, ensembles, X_by_key):
+    """
+    Largest |predict_proba difference| between the XGBoost models and their
+    compiled ensembles, over the rows X_by_key[key] of every segment.
+    """
+    worst = 0.0
+    for key, X in X_by_key.items():
+        expected = models[key].predict_proba(X)[:, 1]
+        worst = max(worst, float(np.max(np.abs(ensembles[key].predict_positive(X) - expected))))
+    return worst
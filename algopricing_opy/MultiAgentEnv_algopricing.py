@@ -20,11 +20,14 @@ def l1l1ll1_opy_ (l1l1ll_opy_):
 import numpy as np
 import copy
 import random
-import matplotlib.pyplot as plt
-import seaborn as ll_opy_
 import pandas as pd
 from cryptography.fernet import Fernet
 import pickle
+from time import perf_counter
+from algopricing_opy.customer_cache import load_customer_file
+from algopricing_opy.customer_sampler import CustomerSampler
+from algopricing_opy.history import History
+from algopricing_opy.renderer import ProfitRenderer
 # l1l11l_opy_ l1l1l1_opy_ from here: l1l11_opy_://l1l11ll_opy_.com/l1111ll_opy_/l11l111_opy_-l111ll1_opy_-l11l11l_opy_/blob/l11l11_opy_/l11l111_opy_/l1lll11l_opy_.py
 # also l11ll1l_opy_: l1l11_opy_://l1ll1ll1_opy_.ai-l111l1_opy_.l1lllll_opy_/l111ll_opy_-a-l1ll1ll_opy_-gym-l1111ll_opy_-l1lll11l_opy_-for-l1l1l1l_opy_-l1l1_opy_/
 def l1ll11_opy_(df, list_of_columns, l1lll1_opy_):
@@ -55,6 +58,7 @@ def l1lll1ll_opy_(l11ll1_opy_):
         return random.randint(l11ll1_opy_[l1l1ll1_opy_ (u"ࠥࡱ࡮ࡴࠢࠆ")], l11ll1_opy_[l1l1ll1_opy_ (u"ࠦࡲࡧࡸࠣࠇ")])
     else:
         return l11ll1_opy_
+EPISODE_RECORDS = ("profits", "inventories", "prices", "winners")
 class MultiAgentEnv_algopricing(object):
     def __init__(
             self,
@@ -63,7 +67,14 @@ class MultiAgentEnv_algopricing(object):
             l11111_opy_=None,
             l1lll111_opy_=None,
             l11ll1_opy_ = {l1l1ll1_opy_ (u"ࠧࡳࡩ࡯ࠤࠈ"): 7, l1l1ll1_opy_ (u"ࠨ࡭ࡢࡺࠥࠉ"): 20},
-            l1111l_opy_ = 20
+            l1111l_opy_ = 20,
+            data_cache = True,
+            seed = None,
+            history = "full",
+            history_length = 1024,
+            headless = False,
+            render_points = 2000,
+            render_figsize = None
         ):
         self.time = 0
         self.cumulative_buyer_utility = 0
@@ -71,39 +82,54 @@ class MultiAgentEnv_algopricing(object):
         self.l11llll_opy_ = params[l1l1ll1_opy_ (u"ࠣࡲࡵࡳ࡯࡫ࡣࡵࡡࡳࡥࡷࡺࠢࠋ")]
         self.l11lll1_opy_ = l11lll1_opy_
         self.agent_profits = [0 for _ in range(self.l1lll11_opy_)]
-        self.l1lll1l1_opy_ = [[] for _ in range(self.l1lll11_opy_)]
+        # per-step histories; "full", "ring" (last history_length steps) or "summary"
+        self.profit_history = History(self.l1lll11_opy_, np.float64, history, history_length)
+        self.inventory_history = History(self.l1lll11_opy_, np.int64, history, history_length)
+        self.customer_history = History(1, np.int64, history, history_length)
+        # headless envs never touch matplotlib/seaborn, not even to import them
+        self.headless = headless
+        self.render_points = render_points
+        self.render_figsize = render_figsize
+        self.renderer = None
         self.l11ll1_opy_ = l11ll1_opy_
         self.l1111l_opy_ = l1111l_opy_
         l1ll11l_opy_ = l1lll1ll_opy_(self.l11ll1_opy_)
         self.l11l_opy_ = [l1ll11l_opy_ for _ in range(self.l1lll11_opy_)]
-        self.l111l1l_opy_ = [[] for _ in range(self.l1lll11_opy_)]
-        self.l1ll1lll_opy_ = []
+        self.customer_time = -1
+        self.customer_row = None
         self.l11111_opy_ = l11111_opy_
         self.l1l111_opy_ = l1lll111_opy_
         self.l11lll_opy_ = None
         self.l11ll_opy_ = None
+        self.data_cache = data_cache
+        self.rng = np.random.default_rng(seed)
+        self.sampler = None
         self.l1l1lll_opy_ = bytes(
             l1l1ll1_opy_ (u"ࠩ࠳࠴࠵࠶࠰࠱࠲࠳࠴࠵࠶࠰࠳࠲࠵࠹࡮ࡸࡥࡢ࡮࡯ࡽ࡭ࡵࡰࡦࡻࡲࡹࡩࡵ࡮ࡵ࡭ࡱࡳࡼࡳࡹ࡬ࡧࡼࡁࠬࠌ"), l1l1ll1_opy_ (u"ࠪࡹࡹ࡬࠭࠹ࠩࠍ")) #l1l1lll_opy_ for l111111_opy_ with l1111l1_opy_
         self._1lll_opy_()
     def _1lll_opy_(self):
         if self.l11111_opy_ is None:
             return
+        elif self.data_cache:
+            # decrypt once, then memory-map the cached plain table (see customer_cache.py)
+            cache_dir = None if self.data_cache is True else self.data_cache
+            self.l11lll_opy_ = load_customer_file(
+                self.l11111_opy_, self.l1l1lll_opy_, l1llll1_opy_, cache_dir)
+            self.l11ll_opy_ = load_customer_file(
+                self.l1l111_opy_, self.l1l1lll_opy_, l1llll1_opy_, cache_dir)
         else:
             self.l11lll_opy_ = l1llll1_opy_(
                 self.l11111_opy_, self.l1l1lll_opy_)
             self.l11ll_opy_ = l1llll1_opy_(
                 self.l1l111_opy_, self.l1l1lll_opy_)
+        self.sampler = CustomerSampler(self.l11lll_opy_, self.l11ll_opy_, self.rng)
     def get_current_customer(self):
-        assert self.time <= len(self.l1ll1lll_opy_)
-        if len(self.l1ll1lll_opy_) == self.time:
-            l1l1111_opy_ = random.choice(
-                self.l11lll_opy_.index.values)
-            l11_opy_ = self.l11lll_opy_.loc[l1l1111_opy_].values
-            l11ll11_opy_ = self.l11ll_opy_.loc[l1l1111_opy_].values
-            self.l1ll1lll_opy_.append((l11_opy_, l11ll11_opy_))
-        else:
-            l11_opy_, l11ll11_opy_ = self.l1ll1lll_opy_[self.time]
-        return l11_opy_, l11ll11_opy_
+        # one customer per step: draw it the first time the current step asks for it
+        if self.customer_time != self.time:
+            self.customer_row = self.sampler.next_index()
+            self.customer_time = self.time
+            self.customer_history.append(self.customer_row)
+        return self.sampler.customer(self.customer_row)
     def get_current_state_customer_to_send_agents(self, l11l1_opy_=None):
         if l11l1_opy_ is None:
             l11l1_opy_ = (np.nan, [np.nan for _ in range(self.l1lll11_opy_)])
@@ -133,40 +159,100 @@ class MultiAgentEnv_algopricing(object):
             )
         else:
             l11l1_opy_ = (np.nan, l1ll1_opy_)
-        for l1llll1l_opy_ in range(self.l1lll11_opy_):
-            self.l1lll1l1_opy_[l1llll1l_opy_].append(
-                self.agent_profits[l1llll1l_opy_])
-            self.l111l1l_opy_[l1llll1l_opy_].append(
-                self.l11l_opy_[l1llll1l_opy_])
+        self.profit_history.append(self.agent_profits)
         self.time += 1
         if self.time % self.l1111l_opy_ == 0:
             l1_opy_ = l1lll1ll_opy_(self.l11ll1_opy_)
             self.l11l_opy_ = [l1_opy_ for _ in range(self.l1lll11_opy_)]
+        # post-step inventory (after any replenishment), the value step() returns
+        self.inventory_history.append(self.l11l_opy_)
         return self.get_current_state_customer_to_send_agents(l11l1_opy_)
     def reset(self):
         self.time = 0
         self.cumulative_buyer_utility = 0
         self.agent_profits = [0 for _ in range(self.l1lll11_opy_)]
-        self.l1lll1l1_opy_ = [[] for _ in range(self.l1lll11_opy_)]
+        self.profit_history.clear()
+        self.inventory_history.clear()
+        self.customer_history.clear()
         l1l111l_opy_ = l1lll1ll_opy_(self.l11ll1_opy_)
         self.l11l_opy_ = [l1l111l_opy_ for _ in range(self.l1lll11_opy_)]
-        self.l111l1l_opy_ = [[] for _ in range(self.l1lll11_opy_)]
-        self.l1ll1lll_opy_ = []
+        self.customer_time = -1
+        self.customer_row = None
+        # customer data never changes between episodes; use reload() to re-read the files
+        if self.l11lll_opy_ is None:
+            self._1lll_opy_()
+    def reload(self):
         self._1lll_opy_()
+    def run_episode(self, agents, T, record=True, reset=True):
+        """
+        Run T steps with `agents` (one per seat) without rendering.
+
+        `record` is True (everything), False, or a subset of EPISODE_RECORDS:
+          profits[T, n]      cumulative profit of each agent after step t
+          inventories[T, n]  inventories the agents saw when pricing step t
+          prices[T, n]       price posted by each agent at step t
+          winners[T]         index of the agent that sold at step t, -1 if nobody did
+        The result also reports wall-clock time spent in each agent's action()
+        (agent_time[n]) and in the env (env_time).
+        """
+        if record is True:
+            record = EPISODE_RECORDS
+        record = set(record or ())
+        if reset:
+            self.reset()
+        n = self.l1lll11_opy_
+        profits = np.empty((T, n)) if "profits" in record else None
+        inventories = np.empty((T, n), dtype=np.int64) if "inventories" in record else None
+        prices = np.empty((T, n)) if "prices" in record else None
+        winners = np.empty(T, dtype=np.int64) if "winners" in record else None
+        agent_time = np.zeros(n)
+        env_time = 0.0
+        start = perf_counter()
+        obs = self.get_current_state_customer_to_send_agents()
+        for t in range(T):
+            if inventories is not None:
+                inventories[t] = obs[3]
+            actions = []
+            for j, agent in enumerate(agents):
+                tick = perf_counter()
+                actions.append(agent.action(obs))
+                agent_time[j] += perf_counter() - tick
+            tick = perf_counter()
+            obs = self.step(actions)
+            env_time += perf_counter() - tick
+            if profits is not None:
+                profits[t] = obs[2]
+            if prices is not None:
+                prices[t] = actions
+            if winners is not None:
+                winners[t] = -1 if np.isnan(obs[1][0]) else obs[1][0]
+        wall_time = perf_counter() - start
+        result = {
+            "agent_profits": np.array(self.agent_profits, dtype=float),
+            "cumulative_buyer_utility": float(np.sum(self.cumulative_buyer_utility)),
+            "agent_time": agent_time,
+            "env_time": env_time,
+            "wall_time": wall_time,
+        }
+        for name, values in (("profits", profits), ("inventories", inventories), ("prices", prices), ("winners", winners)):
+            if values is not None:
+                result[name] = values
+        return result
     def render(self, l111lll_opy_=False, mode=l1l1ll1_opy_ (u"ࠦ࡭ࡻ࡭ࡢࡰࠥࠎ"), close=False, l11l1ll_opy_=20):
+        if self.headless:
+            return False
+        if close:
+            if self.renderer is not None:
+                self.renderer.close()
+            return False
         if self.time % l11l1ll_opy_ == 0:
-            if l111lll_opy_:
-                plt.close()
-            for l1llll1l_opy_ in range(self.l1lll11_opy_):
-                name = l1l1ll1_opy_ (u"ࠧࡇࡧࡦࡰࡷࠤࢀࢃ࠺ࠡࡽࢀࠦࠏ").format(l1llll1l_opy_, self.l11lll1_opy_[l1llll1l_opy_])
-                plt.plot(
-                    list(range(self.time)),
-                    self.l1lll1l1_opy_[l1llll1l_opy_],
-                    label=name,
-                )
-            plt.legend(frameon=False)
-            plt.xlabel(l1l1ll1_opy_ (u"ࠨࡔࡪ࡯ࡨࠦࠐ"))
-            plt.ylabel(l1l1ll1_opy_ (u"ࠢࡑࡴࡲࡪ࡮ࡺࠢࠑ"))
-            ll_opy_.despine()
+            # the lines are updated in place, so there is no previous figure to close
+            if self.renderer is None:
+                labels = [
+                    l1l1ll1_opy_ (u"ࠧࡇࡧࡦࡰࡷࠤࢀࢃ࠺ࠡࡽࢀࠦࠏ").format(l1llll1l_opy_, self.l11lll1_opy_[l1llll1l_opy_])
+                    for l1llll1l_opy_ in range(self.l1lll11_opy_)
+                ]
+                self.renderer = ProfitRenderer(labels, self.render_points, self.render_figsize)
+            self.renderer.draw(self.profit_history.times(), self.profit_history.array())
             return True
         return False
\ No newline at end of file
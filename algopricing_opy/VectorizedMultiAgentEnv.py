@@ -0,0 +1,145 @@
+"""
+Lockstep vectorized version of MultiAgentEnv_algopricing.
+
+Holds B independent episodes in NumPy arrays and resolves one customer for
+every episode per call to step(). The purchase rule, the inventory decrement
+and the replenishment schedule are the same as in the scalar env:
+
+  - the customer buys from the agent with the highest non-negative utility
+    (valuation - price), ties broken by a tiny random perturbation,
+  - agents with no inventory cannot sell,
+  - every `inventory_replenish` steps all agents of an episode are reset to a
+    common inventory limit drawn uniformly from {min..max}.
+
+Episodes are independent of each other, so a batch of B episodes is
+statistically identical to B runs of the scalar env.
+"""
+import numpy as np
+
+
+def _draw_inventory_limit(rng, inventory_limit, size):
+    if isinstance(inventory_limit, dict):
+        return rng.integers(inventory_limit["min"], inventory_limit["max"] + 1, size=size)
+    return np.full(size, inventory_limit, dtype=np.int64)
+
+
+class VectorizedMultiAgentEnv(object):
+    def __init__(
+            self,
+            params,
+            agentnames,
+            n_envs,
+            covariates,
+            valuations,
+            inventory_limit={"min": 7, "max": 20},
+            inventory_replenish=20,
+            seed=None
+        ):
+        self.n_agents = params["n_agents"]
+        self.project_part = params["project_part"]
+        self.agentnames = agentnames
+        self.n_envs = int(n_envs)
+        self.inventory_limit = inventory_limit
+        self.inventory_replenish = inventory_replenish
+
+        # customer table: row r of covariates belongs to row r of valuations
+        self.covariates = np.ascontiguousarray(covariates, dtype=float)
+        self.valuations = np.ascontiguousarray(valuations, dtype=float).reshape(-1)
+        assert self.covariates.shape[0] == self.valuations.shape[0], "Covariates and valuations must have the same number of customers"
+
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    @classmethod
+    def from_env(cls, env, n_envs, seed=None):
+        """
+        Build a vectorized env that shares the customer data already loaded by a
+        scalar MultiAgentEnv_algopricing instance.
+        """
+        params = {"n_agents": env.l1lll11_opy_, "project_part": env.l11llll_opy_}
+        return cls(
+            params, env.l11lll1_opy_, n_envs, env.sampler.covariates, env.sampler.valuations[:, 0],
+            env.l11ll1_opy_, env.l1111l_opy_, seed
+        )
+
+    def reset(self):
+        B, n = self.n_envs, self.n_agents
+        self.time = 0
+        self.cumulative_buyer_utility = np.zeros(B)
+        self.agent_profits = np.zeros((B, n))
+        limits = _draw_inventory_limit(self.rng, self.inventory_limit, B)
+        self.inventories = np.repeat(limits[:, None], n, axis=1)
+        self._sample_customers()
+
+    def _sample_customers(self):
+        self.customer_index = self.rng.integers(0, self.valuations.shape[0], size=self.n_envs)
+        self.current_covariates = self.covariates[self.customer_index]
+        self.current_valuations = self.valuations[self.customer_index]
+
+    def time_until_replenish(self):
+        return self.inventory_replenish - self.time % self.inventory_replenish
+
+    def get_current_state_customer_to_send_agents(self, last_sale=None):
+        """
+        Batched version of the scalar observation:
+        (covariates[B, 3], (winners[B], prices[B, n]), profits[B, n], inventories[B, n], time_until_replenish)
+        """
+        if last_sale is None:
+            last_sale = (
+                np.full(self.n_envs, np.nan),
+                np.full((self.n_envs, self.n_agents), np.nan)
+            )
+        return (
+            self.current_covariates,
+            last_sale,
+            self.agent_profits,
+            self.inventories,
+            self.time_until_replenish(),
+        )
+
+    def episode_obs(self, obs, b):
+        """
+        Slice a batched observation into the 5 tuple the agents expect for episode b.
+        """
+        covariates, (winners, prices), profits, inventories, time_until_replenish = obs
+        winner = winners[b]
+        if not np.isnan(winner):
+            winner = int(winner)
+        return (
+            covariates[b],
+            (winner, prices[b].tolist()),
+            profits[b].tolist(),
+            inventories[b].tolist(),
+            time_until_replenish,
+        )
+
+    def step(self, prices):
+        eps = 1e-7
+        B, n = self.n_envs, self.n_agents
+        prices = np.asarray(prices, dtype=float).reshape(B, n)
+        rows = np.arange(B)
+
+        # same sequential rule as the scalar env, vectorized across episodes
+        best_util = np.zeros(B)
+        winner = np.full(B, -1, dtype=np.int64)
+        noise = (self.rng.random((B, n)) - 0.5) * eps
+        for j in range(n):
+            util = self.current_valuations - prices[:, j]
+            wins = (self.inventories[:, j] > 0) & (util >= 0) & (util + noise[:, j] > best_util)
+            best_util = np.where(wins, util, best_util)
+            winner = np.where(wins, j, winner)
+
+        sold = winner >= 0
+        sold_rows, sold_agents = rows[sold], winner[sold]
+        self.agent_profits[sold_rows, sold_agents] += prices[sold_rows, sold_agents]
+        self.cumulative_buyer_utility[sold] += best_util[sold]
+        self.inventories[sold_rows, sold_agents] -= 1
+        last_sale = (np.where(sold, winner, np.nan), prices)
+
+        self.time += 1
+        if self.time % self.inventory_replenish == 0:
+            limits = _draw_inventory_limit(self.rng, self.inventory_limit, B)
+            self.inventories[:] = limits[:, None]
+
+        self._sample_customers()
+        return self.get_current_state_customer_to_send_agents(last_sale)
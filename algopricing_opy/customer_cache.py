@@ -0,0 +1,87 @@
+"""
+Decrypt-once cache for the Fernet-encrypted customer files.
+
+Decrypting datafile1_2025.csv / datafile2_2025.csv costs one Fernet operation
+per cell. The first load of a file writes the decrypted table to a plain
+float64 .npy file, its index to a second .npy file in the loader's dtype, and
+a small .json sidecar with the column names and dtypes, all keyed by the
+SHA-256 of the source file's bytes and the key. Every later load memory-maps
+the .npy files instead of decrypting again and returns a frame equal to the
+loader's (pd.testing.assert_frame_equal).
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = ".algopricing_cache"
+
+
+def default_cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+
+
+def cache_digest(path, key):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(b"\0")
+    h.update(key if key is not None else b"")
+    return h.hexdigest()
+
+
+def _atomic_save(target, write):
+    tmp = "{}.{}.tmp".format(target, os.getpid())
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, target)
+
+
+def load_customer_file(path, key, loader, cache_dir=None):
+    """
+    Return the same DataFrame as loader(path, key) -- indexed by user_index --
+    backed by a memory-mapped, already-decrypted copy of the file.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir(path)
+    digest = cache_digest(path, key)
+    values_path = os.path.join(cache_dir, digest + ".npy")
+    index_path = os.path.join(cache_dir, digest + ".index.npy")
+    meta_path = os.path.join(cache_dir, digest + ".json")
+
+    if not all(os.path.exists(p) for p in (values_path, index_path, meta_path)):
+        df = loader(path, key)
+        values = df.to_numpy(np.float64)
+        index = np.asarray(df.index.values)
+        meta = {"source": os.path.basename(path), "index_name": df.index.name,
+                "columns": df.columns.tolist(), "dtypes": [str(dtype) for dtype in df.dtypes]}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        _atomic_save(values_path, lambda f: np.save(f, values))
+        _atomic_save(index_path, lambda f: np.save(f, index))
+        _atomic_save(meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    index = pd.Index(np.load(index_path), name=meta["index_name"])
+    df = pd.DataFrame(np.load(values_path, mmap_mode="r"), index=index, columns=meta["columns"], copy=False)
+    if any(dtype != "float64" for dtype in meta["dtypes"]):
+        # plain (key=None) files keep their integer columns; decrypted ones are all float64
+        df = df.astype(dict(zip(meta["columns"], meta["dtypes"])))
+    return df
+
+
+def clear_cache(path=None, cache_dir=None):
+    """
+    Delete cached decrypted tables, either in cache_dir or next to path.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir(path)
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npy") or name.endswith(".json"):
+            os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,54 @@
+"""
+Array-backed customer sampler for MultiAgentEnv_algopricing.
+
+At load time the covariate and valuation tables are joined (by user_index)
+into one contiguous float array. Customer rows are drawn uniformly with
+replacement in blocks from a numpy Generator, so getting the next customer is
+an index into a pre-drawn block plus two array slices -- no pandas objects are
+built per step.
+"""
+import numpy as np
+
+
+class CustomerSampler(object):
+    def __init__(self, covariates, valuations, rng=None, block_size=4096):
+        # align valuations to the covariate rows, like the old per-step .loc lookup
+        valuations = valuations.loc[covariates.index]
+
+        self.user_index = np.asarray(covariates.index.values)
+        self.n_covariates = covariates.shape[1]
+        self.table = np.ascontiguousarray(
+            np.column_stack([covariates.values, valuations.values]), dtype=np.float64
+        )
+        self.table.setflags(write=False)
+        self.covariates = self.table[:, :self.n_covariates]
+        self.valuations = self.table[:, self.n_covariates:]
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.block_size = int(block_size)
+        self._block = np.empty(0, dtype=np.int64)
+        self._pos = 0
+
+    def __len__(self):
+        return self.table.shape[0]
+
+    def _refill(self):
+        self._block = self.rng.integers(0, self.table.shape[0], size=self.block_size)
+        self._pos = 0
+
+    def next_index(self):
+        if self._pos >= self._block.shape[0]:
+            self._refill()
+        row = self._block[self._pos]
+        self._pos += 1
+        return row
+
+    def customer(self, row):
+        """
+        Return (covariates, valuations) of table row `row` as read-only views.
+        """
+        values = self.table[row]
+        return values[:self.n_covariates], values[self.n_covariates:]
+
+    def next(self):
+        return self.customer(self.next_index())
@@ -0,0 +1,112 @@
+"""
+Preallocated per-step history storage for MultiAgentEnv_algopricing.
+
+Each History holds one fixed-width row per step in a NumPy array. The
+retention policy decides the memory cost:
+
+  - "full":    every row, in an array that doubles its capacity when full
+  - "ring":    only the last `length` rows, in a fixed ring buffer
+  - "summary": no rows kept, only count / last / min / max / sum per column
+               (rows are staged in a small block and folded in when it fills)
+"""
+import numpy as np
+
+RETENTION_POLICIES = ("full", "ring", "summary")
+SUMMARY_BLOCK = 256
+
+
+class History(object):
+    def __init__(self, width, dtype=np.float64, retention="full", length=1024):
+        if retention not in RETENTION_POLICIES:
+            raise ValueError("retention must be one of {}, got {!r}".format(RETENTION_POLICIES, retention))
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        self.retention = retention
+        self.length = int(length)
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.last = None
+        self.sum = np.zeros(self.width, dtype=np.float64)
+        self.min = np.full(self.width, np.inf)
+        self.max = np.full(self.width, -np.inf)
+        self._staged = 0
+        if self.retention == "summary":
+            self._data = np.empty((SUMMARY_BLOCK, self.width), dtype=self.dtype)
+        else:
+            self._data = np.empty((self.length, self.width), dtype=self.dtype)
+
+    def _fold(self):
+        block = self._data[:self._staged]
+        if self._staged:
+            np.add(self.sum, block.sum(axis=0), out=self.sum)
+            np.minimum(self.min, block.min(axis=0), out=self.min)
+            np.maximum(self.max, block.max(axis=0), out=self.max)
+        self._staged = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row):
+        if self.retention == "full":
+            if self.count == self._data.shape[0]:
+                grown = np.empty((2 * self._data.shape[0], self.width), dtype=self.dtype)
+                grown[:self.count] = self._data
+                self._data = grown
+            self._data[self.count] = row
+            self.last = self._data[self.count]
+        elif self.retention == "ring":
+            slot = self.count % self.length
+            self._data[slot] = row
+            self.last = self._data[slot]
+        else:
+            if self._staged == SUMMARY_BLOCK:
+                self._fold()
+            self._data[self._staged] = row
+            self.last = self._data[self._staged]
+            self._staged += 1
+        self.count += 1
+
+    def array(self):
+        """
+        Retained rows in time order, shape (n_retained, width). Empty for "summary".
+        """
+        if self.retention == "summary":
+            return np.empty((0, self.width), dtype=self.dtype)
+        if self.retention == "full" or self.count <= self.length:
+            return self._data[:min(self.count, self._data.shape[0])]
+        start = self.count % self.length
+        return np.concatenate([self._data[start:], self._data[:start]])
+
+    def times(self):
+        """
+        Step index of every row returned by array().
+        """
+        if self.retention == "summary":
+            n = 0
+        elif self.retention == "ring":
+            n = min(self.count, self.length)
+        else:
+            n = self.count
+        return np.arange(self.count - n, self.count)
+
+    def summary(self):
+        """
+        count / last / min / max / mean per column. Outside "summary" retention the
+        statistics cover the retained rows only (the last `length` rows for "ring").
+        """
+        if self.count == 0:
+            return {"count": 0, "last": None, "min": None, "max": None, "mean": None}
+        if self.retention == "summary":
+            last = self.last.copy()
+            self._fold()
+            return {
+                "count": self.count, "last": last,
+                "min": self.min.copy(), "max": self.max.copy(), "mean": self.sum / self.count,
+            }
+        data = self.array()
+        return {
+            "count": self.count, "last": data[-1].copy(),
+            "min": data.min(axis=0), "max": data.max(axis=0), "mean": data.mean(axis=0),
+        }
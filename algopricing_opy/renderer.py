@@ -0,0 +1,72 @@
+"""
+Incremental profit plot for MultiAgentEnv_algopricing.render.
+
+The figure, axes and one Line2D per agent are created once and updated with
+set_data() on every frame, instead of re-plotting the whole history. Long
+histories are decimated to at most `max_points` points per line, so the cost
+of a frame stays flat however long the episode runs.
+
+matplotlib and seaborn are imported on first use only, so a headless env
+never imports them.
+"""
+import numpy as np
+
+
+def decimate(times, values, max_points):
+    """
+    Keep every k-th point (and always the last one) so that at most about
+    max_points points are drawn.
+    """
+    n = times.shape[0]
+    if n <= max_points:
+        return times, values
+    stride = -(-n // max_points)
+    idx = np.arange(0, n, stride)
+    if idx[-1] != n - 1:
+        idx = np.append(idx, n - 1)
+    return times[idx], values[idx]
+
+
+class ProfitRenderer(object):
+    def __init__(self, labels, max_points=2000, figsize=None):
+        self.labels = labels
+        self.max_points = max_points
+        self.figsize = figsize
+        self.plt = None
+        self.fig = None
+        self.ax = None
+        self.lines = []
+
+    def _setup(self):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        self.plt = plt
+        self.fig, self.ax = plt.subplots(figsize=self.figsize)
+        self.lines = [self.ax.plot([], [], label=label)[0] for label in self.labels]
+        self.ax.legend(frameon=False)
+        self.ax.set_xlabel("Time")
+        self.ax.set_ylabel("Profit")
+        sns.despine(ax=self.ax)
+
+    def close(self):
+        if self.fig is not None:
+            self.plt.close(self.fig)
+        self.fig = None
+
+    def draw(self, times, values):
+        """
+        Update every agent's line from the (times[T], values[T, n_agents]) history.
+        """
+        if self.fig is None or not self.plt.fignum_exists(self.fig.number):
+            self._setup()
+        else:
+            # keep plt.gcf() pointing at this figure for display(plt.gcf())
+            self.plt.figure(self.fig.number)
+
+        times, values = decimate(times, values, self.max_points)
+        for j, line in enumerate(self.lines):
+            line.set_data(times, values[:, j])
+        self.ax.relim()
+        self.ax.autoscale_view()
+        return self.fig
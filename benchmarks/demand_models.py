@@ -0,0 +1,266 @@
+"""
+Revenue against decision cost for the candidate demand models, as a Pareto table.
+
+Candidates, all fitted here on the same training split:
+
+  xgb_8seg            8 segment XGBClassifiers (train_segments) compiled by tree_ensemble,
+                      as the agents run them
+  xgb_8seg_sklearn    the same models through XGBClassifier.predict_proba
+  logistic_8seg       8 segment LogisticRegressions through the closed-form LogisticEngine
+  xgb_global          one XGBClassifier on all segments (train_segments settings)
+  lgbm_global         one LGBMClassifier on all segments, if lightgbm is installed
+
+trained_model (the template's LinearRegression) is not a candidate: it maps
+the covariates to two numbers with no recorded decoding into P(buy | price),
+so there is nothing faithful to score.
+
+The training CSV is split at random (--holdout, seeded): the candidates are
+fitted on one part, and the log loss and AUC columns are measured on the
+held-out rows. Revenue needs true valuations, which the training CSV does
+not have, so it is measured on the env's customer table, leaving out any
+customer whose covariates also occur in the training CSV. Every customer is
+offered the revenue-maximising price on the 100-point grid and buys when
+that price is at most their valuation. The revenue column is the mean
+revenue per customer, and in brackets the share of the total valuation it
+captures.
+
+Latencies: single and grid are medians over --latency_customers customers
+of one predict_at (single decision) and one 100-point grid (the agents'
+myopic step; the budget is 500 ms per decision). batch is the best of
+--repeats timeit runs of the grid for 1000 customers at once, per customer
+(throughput). Load time and resident memory are measured in a fresh process
+per candidate. A candidate is on the Pareto front ("*") when no other one
+has both higher revenue and a lower grid latency.
+
+    python benchmarks/demand_models.py --customers 2000
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.demand_model import DemandModel, LogisticBackend, SklearnBackend, TreeBackend
+from agents.logistic_engine import load_logistic_engine
+from agents.segments import SEGMENT_KEYS
+from agents.train_segments import COVARIATES, MODEL_SPECS, PRICE, TARGET, train_segments, write_models
+from agents.tree_ensemble import compile_xgb, load_xgb_ensembles
+
+PRICE_GRID = np.linspace(0.01, 500, 100)
+DECISION_BUDGET_MS = 500.0
+BATCH = 1000
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _everywhere(model):
+    return {key: model for key in SEGMENT_KEYS}
+
+
+def _xgb_8seg(path):
+    return DemandModel(TreeBackend(load_xgb_ensembles(path)))
+
+
+def _xgb_8seg_sklearn(path):
+    return DemandModel(SklearnBackend(_load_pickle(path), columns=("P", "C1", "C2", "C3")))
+
+
+def _logistic_8seg(path):
+    return DemandModel(LogisticBackend(load_logistic_engine(path)))
+
+
+def _xgb_global(path):
+    # one compiled ensemble shared by every segment
+    return DemandModel(TreeBackend(_everywhere(compile_xgb(_load_pickle(path)))))
+
+
+def _lgbm_global(path):
+    return DemandModel(SklearnBackend(_everywhere(_load_pickle(path)), columns=("P", "C1", "C2", "C3")))
+
+
+def _train_global(train, make_model, path):
+    columns = MODEL_SPECS["xgb"][1]
+    model = make_model()
+    model.fit(train[columns].to_numpy(np.float64), train[TARGET].to_numpy().astype(np.int64))
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return path
+
+
+def _train_8seg(train, kind, path):
+    write_models(train_segments(train, kind, os.cpu_count() or 1)[0], path)
+    return path
+
+
+def split_training(train_file, holdout, seed):
+    """
+    (fit rows, held-out rows) of the training CSV, a seeded random split.
+    """
+    train = pd.read_csv(train_file)
+    held = np.random.default_rng(seed).random(len(train)) < holdout
+    return train[~held].reset_index(drop=True), train[held].reset_index(drop=True)
+
+
+def candidates(fit, workdir):
+    """
+    [(name, loader, model path)], every model trained on the rows of `fit` into workdir.
+    """
+    cores = os.cpu_count() or 1
+    xgb_8seg = _train_8seg(fit, "xgb", os.path.join(workdir, "8_xgb.pkl"))
+    found = [
+        ("xgb_8seg", _xgb_8seg, xgb_8seg),
+        ("xgb_8seg_sklearn", _xgb_8seg_sklearn, xgb_8seg),
+        ("logistic_8seg", _logistic_8seg, _train_8seg(fit, "logistic", os.path.join(workdir, "8_models_dict.pkl"))),
+        ("xgb_global", _xgb_global, _train_global(
+            fit, lambda: MODEL_SPECS["xgb"][2](cores), os.path.join(workdir, "xgb_global.pkl"))),
+    ]
+    try:
+        from lightgbm import LGBMClassifier
+    except ImportError:
+        print("lightgbm not installed: skipping lgbm_global")
+    else:
+        found.append(("lgbm_global", _lgbm_global, _train_global(
+            fit, lambda: LGBMClassifier(verbose=-1), os.path.join(workdir, "lgbm_global.pkl"))))
+    return found
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _measure_load(loader, path):
+    rss = _rss_bytes()
+    start = time.perf_counter()
+    demand = loader(path)
+    demand.predict_at(1.0, 1.0, 1.0, 1.0)
+    seconds = time.perf_counter() - start
+    after = _rss_bytes()
+    return seconds, None if rss is None or after is None else after - rss
+
+
+def held_out_customers(first_file, second_file, train):
+    """
+    (covariates, valuations) of the env's customers that do not occur in the training rows.
+    """
+    from algopricing_opy.MultiAgentEnv_algopricing import MultiAgentEnv_algopricing
+    from settings import default_params_1
+
+    env = MultiAgentEnv_algopricing(default_params_1, ["a"], first_file, second_file)
+    covariates = np.asarray(env.sampler.covariates, dtype=float)
+    valuations = np.asarray(env.sampler.valuations, dtype=float)[:, 0]
+    seen = set(map(tuple, train[COVARIATES].to_numpy(np.float64).tolist()))
+    fresh = np.array([tuple(c) not in seen for c in covariates.tolist()], dtype=bool)
+    return covariates[fresh], valuations[fresh]
+
+
+def median_ms(fn, items):
+    timings = np.empty(len(items))
+    for i, item in enumerate(items):
+        start = time.perf_counter()
+        fn(item)
+        timings[i] = time.perf_counter() - start
+    return 1e3 * np.median(timings)
+
+
+def classification(demand, held):
+    """
+    Log loss and AUC of P(buy) on the held-out training rows.
+    """
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    probs = demand.predict_batch(held[COVARIATES].to_numpy(np.float64), held[PRICE].to_numpy(np.float64))
+    y = held[TARGET].to_numpy().astype(np.int64)
+    return log_loss(y, np.clip(probs, 1e-7, 1 - 1e-7), labels=[0, 1]), roc_auc_score(y, probs)
+
+
+def evaluate(demand, covariates, valuations, held, n_latency, repeats):
+    probs = np.vstack([demand.predict_grid(covariates[i:i + BATCH], PRICE_GRID)
+                       for i in range(0, covariates.shape[0], BATCH)])
+    prices = PRICE_GRID[np.argmax(probs * PRICE_GRID, axis=1)]
+    revenue = np.where(prices <= valuations, prices, 0.0)
+    logloss, auc = classification(demand, held)
+
+    sample = covariates[:n_latency]
+    batch = covariates[:BATCH]
+    batch_s = min(timeit.repeat(lambda: demand.predict_grid(batch, PRICE_GRID), number=1, repeat=repeats))
+    return {
+        "revenue": revenue.mean(),
+        "captured": revenue.sum() / valuations.sum(),
+        "logloss": logloss,
+        "auc": auc,
+        "single_ms": median_ms(lambda c: demand.predict_at(c[0], c[1], c[2], 100.0), sample),
+        "grid_ms": median_ms(lambda c: demand.predict_grid(c, PRICE_GRID), sample),
+        "batch_us": 1e6 * batch_s / batch.shape[0],
+    }
+
+
+def pareto(rows):
+    for row in rows:
+        row["pareto"] = not any(
+            other is not row and other["revenue"] >= row["revenue"] and other["grid_ms"] <= row["grid_ms"]
+            and (other["revenue"] > row["revenue"] or other["grid_ms"] < row["grid_ms"])
+            for other in rows
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train_file", default="data/train_prices_decisions_2025.csv")
+    parser.add_argument("--first_file", default="data/datafile1_2025.csv")
+    parser.add_argument("--second_file", default="data/datafile2_2025.csv")
+    parser.add_argument("--customers", type=int, default=2000, help="held-out customers scored for revenue")
+    parser.add_argument("--holdout", type=float, default=0.25, help="share of training rows held out")
+    parser.add_argument("--latency_customers", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=7, help="timeit repeats of the batch timing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fit, held = split_training(args.train_file, args.holdout, args.seed)
+    covariates, valuations = held_out_customers(args.first_file, args.second_file, pd.concat([fit, held]))
+    rng = np.random.default_rng(args.seed)
+    pick = rng.choice(covariates.shape[0], min(args.customers, covariates.shape[0]), replace=False)
+    covariates, valuations = covariates[pick], valuations[pick]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, loader, path in candidates(fit, workdir):
+            with ProcessPoolExecutor(1) as pool:
+                load_s, rss = pool.submit(_measure_load, loader, path).result()
+            row = evaluate(loader(path), covariates, valuations, held, args.latency_customers, args.repeats)
+            row.update(name=name, load_s=load_s, rss_mb=None if rss is None else rss / 2.0 ** 20,
+                       file_mb=os.path.getsize(path) / 2.0 ** 20)
+            rows.append(row)
+            print("scored {}".format(name), flush=True)
+    pareto(rows)
+
+    print("\nfitted on {} training rows, {} held out; revenue on {} env customers; "
+          "{}-point price grid, {:.0f} ms decision budget".format(
+              len(fit), len(held), covariates.shape[0], PRICE_GRID.size, DECISION_BUDGET_MS))
+    print("{:<2s}{:<18s} {:>18s} {:>8s} {:>6s} {:>10s} {:>10s} {:>10s} {:>9s} {:>8s} {:>8s} {:>8s}".format(
+        "", "model", "revenue/customer", "logloss", "AUC", "single ms", "grid ms", "batch us", "budget",
+        "load s", "RSS MB", "file MB"))
+    for row in sorted(rows, key=lambda r: -r["revenue"]):
+        print("{:<2s}{:<18s} {:>9.2f} ({:>5.1%}) {:>8.4f} {:>6.3f} {:>10.3f} {:>10.3f} {:>10.1f} {:>8.3%} {:>8.2f} {:>8s} {:>8.2f}".format(
+            "*" if row["pareto"] else "", row["name"], row["revenue"], row["captured"], row["logloss"], row["auc"],
+            row["single_ms"],
+            row["grid_ms"], row["batch_us"], row["grid_ms"] / DECISION_BUDGET_MS, row["load_s"],
+            "n/a" if row["rss_mb"] is None else "{:.1f}".format(row["rss_mb"]), row["file_mb"]))
+
+
+if __name__ == "__main__":
+    main()
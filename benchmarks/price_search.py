@@ -0,0 +1,84 @@
+"""
+Revenue and latency of the agents/price_search.py optimizers against the
+fixed 100-point PRICE_GRID.
+
+For customers sampled from the test covariates, every optimizer maximises
+p * P(buy | p) under each demand backend. Its revenue is compared with a
+reference 0.01-resolution grid search over the same range.
+
+    python benchmarks/price_search.py --customers 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.demand_model import BACKENDS, load_demand_model
+from agents.price_search import PRICE_MAX, PRICE_MIN, make_price_search, revenue_function
+
+SEARCHES = [
+    ("grid", {}),
+    ("coarse_to_fine", {}),
+    ("coarse_to_fine", {"coarse": 12, "refine": 6, "rounds": 2}),
+    ("golden", {}),
+    ("foc_bisection", {}),
+    ("auto", {}),
+]
+REFERENCE_STEP = 0.01
+REFERENCE_CHUNK = 10000
+
+
+def reference_optimum(f):
+    best_p, best_v = PRICE_MIN, -np.inf
+    prices = np.arange(PRICE_MIN, PRICE_MAX + REFERENCE_STEP / 2, REFERENCE_STEP)
+    for start in range(0, prices.size, REFERENCE_CHUNK):
+        chunk = prices[start:start + REFERENCE_CHUNK]
+        values = f(chunk)
+        i = int(np.argmax(values))
+        if values[i] > best_v:
+            best_p, best_v = chunk[i], values[i]
+    return best_p, best_v
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--test_file", default="data/test_user_info_2025.csv")
+    parser.add_argument("--customers", type=int, default=300)
+    parser.add_argument("--kinds", nargs="*", default=sorted(BACKENDS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    covariates = pd.read_csv(args.test_file)[["Covariate1", "Covariate2", "Covariate3"]].to_numpy()
+    rng = np.random.default_rng(args.seed)
+    covariates = covariates[rng.choice(covariates.shape[0], args.customers, replace=False)]
+
+    for kind in args.kinds:
+        demand = load_demand_model(kind)
+        functions = [revenue_function(demand, *c) for c in covariates]
+        reference = np.array([reference_optimum(f)[1] for f in functions])
+
+        print("\n{} demand, {} customers (revenue relative to a {:.2f}-step grid)".format(
+            kind, args.customers, REFERENCE_STEP))
+        print("{:<46s} {:>10s} {:>10s} {:>8s} {:>8s} {:>10s}".format(
+            "search", "mean rev", "worst rev", "calls", "evals", "ms/search"))
+        for name, kwargs in SEARCHES:
+            search = make_price_search(name, **kwargs)
+            revenues = np.empty(len(functions))
+            start = time.perf_counter()
+            for i, f in enumerate(functions):
+                revenues[i] = search.maximize(f)[1]
+            elapsed = time.perf_counter() - start
+            ratio = revenues / np.maximum(reference, 1e-12)
+            label = name + (" " + ",".join("{}={}".format(k, v) for k, v in sorted(kwargs.items())) if kwargs else "")
+            print("{:<46s} {:>9.4f}% {:>9.4f}% {:>8.1f} {:>8.1f} {:>10.3f}".format(
+                label, 100 * ratio.mean(), 100 * ratio.min(), search.calls / len(functions),
+                search.evals / len(functions), 1e3 * elapsed / len(functions)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Reset latency of MultiAgentEnv_algopricing: reset() now keeps the loaded
+customer data, while reload() re-reads the data files the way reset() used to.
+
+    python benchmarks/reset_latency.py --first_file data/datafile1_2025.csv --second_file data/datafile2_2025.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import *
+from algopricing_opy.MultiAgentEnv_algopricing import MultiAgentEnv_algopricing
+
+
+def time_calls(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def report(label, timings):
+    print("{:<40s} median {:10.3f} ms   p95 {:10.3f} ms".format(
+        label, 1e3 * np.median(timings), 1e3 * np.percentile(timings, 95)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--first_file", default="data/datafile1_2025.csv")
+    parser.add_argument("--second_file", default="data/datafile2_2025.csv")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    for data_cache in (False, True):
+        env = MultiAgentEnv_algopricing(
+            default_params_2, ["a", "b"], args.first_file, args.second_file,
+            default_params_2["inventory_limit"], default_params_2["inventory_replenish"],
+            data_cache=data_cache
+        )
+
+        def old_reset():
+            env.reset()
+            env.reload()
+
+        suffix = "(decrypt cache)" if data_cache else "(no cache)"
+        report("before: reset + reload " + suffix, time_calls(old_reset, args.repeats))
+        report("after:  reset " + suffix, time_calls(env.reset, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
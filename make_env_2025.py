@@ -6,12 +6,15 @@ from settings import *
 
 import algopricing_opy.MultiAgentEnv_algopricing as MultiAgentEnv_algopricing
 from algopricing_opy.MultiAgentEnv_algopricing import MultiAgentEnv_algopricing
+from algopricing_opy.VectorizedMultiAgentEnv import VectorizedMultiAgentEnv
 
 # import algopricing.MultiAgentEnv_algopricing as MultiAgentEnv_algopricing
 # from algopricing.MultiAgentEnv_algopricing import MultiAgentEnv_algopricing
 
-def make_env_agents(agentnames, project_part = 1, params=None, first_file=None, second_file=None):
+def make_env_agents(agentnames, project_part = 1, params=None, first_file=None, second_file=None,
+                    instrument=False, action_budget=0.5, host=None, **env_kwargs):
     import agents
+    from agents.instrumentation import instrument as instrument_agents
 
     if project_part == 1 and params is None:
         params = default_params_1
@@ -20,11 +23,33 @@ def make_env_agents(agentnames, project_part = 1, params=None, first_file=None,
     
     assert params.get("n_agents") == len(agentnames), "Number of agents must match number of agent names"
 
-    agents = [
-        agents.load(name + ".py").Agent(en, params)
-        for en, name in enumerate(agentnames)
-    ]
+    if host is not None:
+        # agents run in warm subprocesses owned by an agents.sandbox.AgentHost
+        agents = host.make_agents(agentnames, params)
+    else:
+        agents = [
+            agents.load(name + ".py").Agent(en, params)
+            for en, name in enumerate(agentnames)
+        ]
+    if instrument:
+        # time every action() call against the per-action budget
+        agents = instrument_agents(agents, agentnames, action_budget)
     env = MultiAgentEnv_algopricing(
-        params, agentnames, first_file, second_file, params["inventory_limit"], params["inventory_replenish"]
+        params, agentnames, first_file, second_file, params["inventory_limit"], params["inventory_replenish"],
+        **env_kwargs
     )
     return env, agents
+
+
+def make_vectorized_env(agentnames, n_envs, project_part = 1, params=None, first_file=None, second_file=None, seed=None):
+    if project_part == 1 and params is None:
+        params = default_params_1
+    elif project_part == 2 and params is None:
+        params = default_params_2
+
+    assert params.get("n_agents") == len(agentnames), "Number of agents must match number of agent names"
+
+    env = MultiAgentEnv_algopricing(
+        params, agentnames, first_file, second_file, params["inventory_limit"], params["inventory_replenish"]
+    )
+    return VectorizedMultiAgentEnv.from_env(env, n_envs, seed)
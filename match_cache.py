@@ -0,0 +1,180 @@
+"""
+Content-hash keyed store of tournament match results.
+
+A match result is keyed by the SHA-256 of everything that can change it:
+
+  - the source of both agent files, in seat order,
+  - every file those agents load: model pickles and other artifacts named by a
+    string literal in the source, plus the agents-package modules they import
+    (followed recursively),
+  - the environment: every module of algopricing_opy, make_env_2025.py and
+    settings.py (ENV_FILES), so a change to the env rules replays every match,
+  - the customer data files, the env params, T and the seed.
+
+Re-running a tournament after editing one agent therefore only replays the
+pairings that involve that agent.
+"""
+import ast
+import glob
+import hashlib
+import json
+import os
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.join(REPO_DIR, "agents")
+DEFAULT_CACHE_DIR = os.path.join(REPO_DIR, ".tournament_cache")
+# the simulator: matched against REPO_DIR, globs expanded at key time
+ENV_FILES = ["algopricing_opy/*.py", "make_env_2025.py", "settings.py"]
+
+_file_hashes = {}
+
+
+def file_hash(path):
+    """
+    SHA-256 of a file's bytes, memoized per (path, mtime, size).
+    """
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if memo_key not in _file_hashes:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _file_hashes[memo_key] = h.hexdigest()
+    return _file_hashes[memo_key]
+
+
+def _resolve_literal(value, source_dir):
+    if not value or len(value) > 255 or "\n" in value:
+        return None
+    candidates = [
+        os.path.join(REPO_DIR, value),
+        os.path.join(source_dir, value),
+        os.path.join(AGENTS_DIR, value),
+        os.path.join(AGENTS_DIR, "dealmakers", value),
+    ]
+    for path in candidates:
+        if os.path.isfile(path):
+            return os.path.abspath(path)
+    return None
+
+
+def _resolve_import(node, source_path):
+    names = []
+    if isinstance(node, ast.Import):
+        names = [alias.name for alias in node.names]
+    elif isinstance(node, ast.ImportFrom):
+        if node.level:
+            base = os.path.dirname(source_path)
+            for _ in range(node.level - 1):
+                base = os.path.dirname(base)
+            parts = (node.module or "").split(".") if node.module else []
+            module_path = os.path.join(base, *parts)
+            paths = [module_path + ".py", os.path.join(module_path, "__init__.py")]
+            paths += [os.path.join(module_path, alias.name + ".py") for alias in node.names]
+            return [p for p in paths if os.path.isfile(p)]
+        names = [node.module or ""] + ["{}.{}".format(node.module, alias.name) for alias in node.names]
+
+    paths = []
+    for name in names:
+        if name != "agents" and not name.startswith("agents."):
+            continue
+        module_path = os.path.join(REPO_DIR, *name.split("."))
+        for path in (module_path + ".py", os.path.join(module_path, "__init__.py")):
+            if os.path.isfile(path):
+                paths.append(path)
+    return paths
+
+
+def agent_dependencies(agent_file):
+    """
+    Sorted list of files an agent depends on: its own source, files named by
+    string literals in it, and imported agents-package modules (recursively).
+    """
+    seen = set()
+    todo = [os.path.abspath(agent_file)]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        if not path.endswith(".py"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                dep = _resolve_literal(node.value, os.path.dirname(path))
+                if dep is not None:
+                    todo.append(dep)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                todo.extend(os.path.abspath(p) for p in _resolve_import(node, path))
+    return sorted(seen)
+
+
+def agent_fingerprint(agentname):
+    """
+    Hash of every file the agent `agentname` (as passed to agents.load) depends on.
+    """
+    h = hashlib.sha256()
+    for path in agent_dependencies(os.path.join(AGENTS_DIR, agentname + ".py")):
+        h.update(os.path.relpath(path, REPO_DIR).encode("utf-8"))
+        h.update(file_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def env_fingerprint(patterns=ENV_FILES):
+    """
+    Hash of the environment's source files (ENV_FILES, relative to REPO_DIR).
+    """
+    h = hashlib.sha256()
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(REPO_DIR, pattern))):
+            h.update(os.path.relpath(path, REPO_DIR).encode("utf-8"))
+            h.update(file_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def match_key(seat0, seat1, seed, T, params, data_files):
+    payload = {
+        "agents": [agent_fingerprint(seat0), agent_fingerprint(seat1)],
+        "env": env_fingerprint(),
+        "data": [file_hash(path) if path and os.path.exists(path) else None for path in data_files],
+        "params": params,
+        "seed": seed,
+        "T": T,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class MatchCache(object):
+    """
+    One JSON file per match result in cache_dir, written atomically so that
+    concurrent tournaments can share the directory.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, result):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = "{}.{}.tmp".format(self._path(key), os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, self._path(key))
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
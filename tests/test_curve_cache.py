@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from agents.curve_cache import ENTRY_OVERHEAD, CurveCache
+
+WIDTH = 4
+
+
+def _cache(capacity, dtype=np.float64):
+    return CurveCache(WIDTH, capacity * (WIDTH * np.dtype(dtype).itemsize + ENTRY_OVERHEAD), dtype)
+
+
+def _values(key):
+    return np.arange(WIDTH, dtype=float) + 10.0 * key
+
+
+def _check_table(cache):
+    # every resident row is found at its slot, and no slot points at a free row
+    for row in range(cache.size):
+        key = cache._keys[row]
+        if key is not None:
+            assert cache._slots[cache._slot_of[row]] == row
+            assert cache._find(key, hash(key))[0] == row
+    resident = [r for r in cache._slots if r != -1]
+    assert len(resident) == len(set(resident)) == sum(k is not None for k in cache._keys)
+
+
+def test_get_returns_what_was_put():
+    cache = _cache(16)
+    for key in range(10):
+        stored = cache.put(key, _values(key))
+        np.testing.assert_array_equal(stored, _values(key))
+    for key in range(10):
+        np.testing.assert_array_equal(cache.get(key), _values(key))
+    assert cache.get(99) is None
+    with pytest.raises(ValueError):
+        cache.get(0)[0] = 1.0
+    cache.put(3, _values(30))
+    np.testing.assert_array_equal(cache.get(3), _values(30))
+    assert len(cache) == 10
+
+
+@pytest.mark.parametrize("stride", [1, 8])
+def test_random_workload_matches_dict(stride):
+    # stride 8 puts the keys in two long probe chains that run into each other,
+    # so deletions leave holes inside chains that backward shifting must close
+    cache = _cache(8)
+    assert cache.capacity == 8
+    reference = {}
+    rng = np.random.default_rng(0)
+    for step in range(5000):
+        key = int(rng.integers(0, 40)) * stride
+        if rng.random() < 0.5:
+            cache.put(key, _values(key + step))
+            reference[key] = _values(key + step)
+        else:
+            found = cache.get(key)
+            if found is not None:
+                np.testing.assert_array_equal(found, reference[key])
+        assert len(cache) <= cache.capacity
+        if step % 97 == 0:
+            _check_table(cache)
+    _check_table(cache)
+    assert cache.stats()["evictions"] > 0
+
+
+def test_clock_keeps_referenced_rows():
+    cache = _cache(4)
+    for key in range(4):
+        cache.put(key, _values(key))
+    # one full sweep clears every reference bit and evicts row 0
+    cache.put(4, _values(4))
+    assert cache.get(0) is None
+    cache.get(1)
+    cache.put(5, _values(5))
+    assert cache.get(1) is not None and cache.get(2) is None
+
+
+def test_tuple_and_bytes_keys_and_clear():
+    cache = _cache(8, np.float32)
+    cache.put((1.5, 2.5, 3.0), _values(1))
+    cache.put(b"\x00\x01", _values(2))
+    np.testing.assert_allclose(cache.get((1.5, 2.5, 3.0)), _values(1))
+    np.testing.assert_allclose(cache.get(b"\x00\x01"), _values(2))
+    cache.clear()
+    assert len(cache) == 0 and cache.get((1.5, 2.5, 3.0)) is None
+    cache.put((1.5, 2.5, 3.0), _values(3))
+    np.testing.assert_allclose(cache.get((1.5, 2.5, 3.0)), _values(3))
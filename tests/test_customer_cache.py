@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algopricing_opy.MultiAgentEnv_algopricing import l1llll1_opy_ as load_customers
+from algopricing_opy.customer_cache import clear_cache, load_customer_file
+
+
+def _customers(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "user_index": np.arange(n),
+        "Covariate1": rng.normal(2.7, 1.0, n),
+        "Covariate2": rng.normal(2.7, 1.0, n),
+        "Covariate3": rng.integers(0, 15, n),
+    })
+
+
+def _encrypted(df, key):
+    fernet = pytest.importorskip("cryptography.fernet").Fernet(key)
+    return df.apply(lambda col: col.map(lambda x: str(fernet.encrypt(repr(float(x)).encode().hex().encode()))))
+
+
+@pytest.mark.parametrize("encrypt", [False, True])
+def test_cached_frame_equals_loader(tmp_path, encrypt):
+    df = _customers()
+    key = None
+    if encrypt:
+        key = pytest.importorskip("cryptography.fernet").Fernet.generate_key()
+        df = _encrypted(df, key)
+    path = str(tmp_path / "customers.csv")
+    df.to_csv(path, index=False)
+    cache_dir = str(tmp_path / "cache")
+
+    expected = load_customers(path, key)
+    first = load_customer_file(path, key, load_customers, cache_dir)
+    second = load_customer_file(path, key, load_customers, cache_dir)
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    assert second.index.dtype == (np.float64 if encrypt else np.int64)
+
+    clear_cache(cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(load_customer_file(path, key, load_customers, cache_dir), expected)
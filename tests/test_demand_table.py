@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.demand_model import load_demand_model
+from agents.demand_table import PRICE_GRID, build_demand_table, load_demand_table, table_paths
+
+TEST_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "test_user_info_2025.csv")
+
+
+@pytest.fixture(scope="module")
+def covariates():
+    covariates = pd.read_csv(TEST_FILE, nrows=300)[["Covariate1", "Covariate2", "Covariate3"]].to_numpy(np.float64)
+    # repeated customers share one row of the table
+    return np.concatenate([covariates, covariates[:50]])
+
+
+@pytest.fixture
+def table_dir(tmp_path, covariates):
+    build_demand_table("logistic", covariates, table_dir=str(tmp_path), chunk_rows=64)
+    return str(tmp_path)
+
+
+def test_lookup_matches_model(table_dir, covariates):
+    table = load_demand_table("logistic", PRICE_GRID, table_dir)
+    assert len(table) == len(np.unique(covariates, axis=0))
+    expected = load_demand_model("logistic").predict_grid(covariates, PRICE_GRID)
+    found = np.array([table.lookup(*row) for row in covariates])
+    assert found.dtype == np.float32
+    np.testing.assert_allclose(found, expected, rtol=1e-6, atol=1e-7)
+    assert table.lookup(-1.0, -1.0, -1.0) is None
+    assert table.stats()["hits"] == len(covariates) and table.stats()["misses"] == 1
+
+
+def test_missing_table(tmp_path):
+    assert load_demand_table("logistic", PRICE_GRID, str(tmp_path)) is None
+
+
+def test_other_price_grid(table_dir):
+    assert load_demand_table("logistic", None, table_dir) is not None
+    assert load_demand_table("logistic", PRICE_GRID[:-1], table_dir) is None
+    assert load_demand_table("logistic", PRICE_GRID + 0.5, table_dir) is None
+
+
+def test_changed_model(table_dir):
+    meta_path = table_paths("logistic", table_dir)[2]
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["model_sha256"] = "0" * 64
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    assert load_demand_table("logistic", PRICE_GRID, table_dir) is None
+
+
+def test_damaged_files(table_dir):
+    curves_path, keys_path, meta_path = table_paths("logistic", table_dir)
+    os.remove(keys_path)
+    assert load_demand_table("logistic", PRICE_GRID, table_dir) is None
+    with open(meta_path, "w") as f:
+        f.write("{")
+    assert load_demand_table("logistic", PRICE_GRID, table_dir) is None
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from agents.train_segments import XGB_PARAMS
+from agents.tree_ensemble import compile_xgb
+
+xgboost = pytest.importorskip("xgboost")
+
+TOLERANCE = 1e-6
+PRICE_GRID = np.linspace(0.01, 500, 100)
+
+
+def _data(n=3000, seed=0):
+    # [price, C1, C2, C3] like 8_xgb.pkl, with a price-driven purchase
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(0, 500, n), rng.normal(2.7, 1.0, (n, 2)), rng.integers(0, 15, n)])
+    logit = 2.0 - X[:, 0] / 80.0 + 0.5 * X[:, 1] - 0.3 * X[:, 2] + 0.05 * X[:, 3]
+    y = (rng.random(n) < 1.0 / (1.0 + np.exp(-logit))).astype(int)
+    return X, y
+
+
+def _fit(**overrides):
+    params = dict(XGB_PARAMS, n_estimators=60, n_jobs=1)
+    params.update(overrides)
+    X, y = _data()
+    return xgboost.XGBClassifier(**params).fit(X, y), X
+
+
+@pytest.mark.parametrize("max_depth", [6, 8])
+def test_predict_proba_matches_xgboost(max_depth):
+    model, X = _fit(max_depth=max_depth)
+    ensemble = compile_xgb(model)
+    expected = model.predict_proba(X)[:, 1]
+    assert np.max(np.abs(ensemble.predict_proba(X)[:, 1] - expected)) < TOLERANCE
+    assert np.max(np.abs(ensemble.predict_positive(X[0]) - expected[:1])) < TOLERANCE
+
+
+def test_nan_follows_default_direction():
+    model, X = _fit()
+    X = X[:500].copy()
+    X[::3, 1] = np.nan
+    X[1::5, 0] = np.nan
+    ensemble = compile_xgb(model)
+    assert np.max(np.abs(ensemble.predict_positive(X) - model.predict_proba(X)[:, 1])) < TOLERANCE
+
+
+@pytest.mark.parametrize("n_rows", [1, 200])
+def test_grid_matches_xgboost(n_rows):
+    model, X = _fit()
+    ensemble = compile_xgb(model)
+    rows = X[:n_rows]
+    full = np.repeat(rows, PRICE_GRID.size, axis=0)
+    full[:, 0] = np.tile(PRICE_GRID, n_rows)
+    expected = model.predict_proba(full)[:, 1].reshape(n_rows, PRICE_GRID.size)
+    assert np.max(np.abs(ensemble.predict_grid_positive(rows, PRICE_GRID) - expected)) < TOLERANCE
+
+
+def test_early_stopping_uses_best_iteration():
+    X, y = _data()
+    model = xgboost.XGBClassifier(**dict(XGB_PARAMS, n_estimators=200, n_jobs=1, early_stopping_rounds=5))
+    model.fit(X[:2000], y[:2000], eval_set=[(X[2000:], y[2000:])], verbose=False)
+    assert model.best_iteration + 1 < 200
+    ensemble = compile_xgb(model)
+    assert np.max(np.abs(ensemble.predict_positive(X) - model.predict_proba(X)[:, 1])) < TOLERANCE
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from algopricing_opy.MultiAgentEnv_algopricing import MultiAgentEnv_algopricing
+from algopricing_opy.VectorizedMultiAgentEnv import VectorizedMultiAgentEnv
+from algopricing_opy.customer_sampler import CustomerSampler
+from settings import default_params_2
+
+PRICES = [70.0, 95.0]
+EPISODES = 60
+T = 200
+
+
+def _scalar_env(seed=0, n_customers=500):
+    # the env without data files, given a synthetic customer table instead
+    rng = np.random.default_rng(seed)
+    covariates = pd.DataFrame(rng.normal(2.7, 1.0, (n_customers, 3)), columns=["Covariate1", "Covariate2", "Covariate3"])
+    valuations = pd.DataFrame({"valuation": 40.0 + 20.0 * rng.gamma(2.0, 1.0, n_customers)})
+    params = default_params_2
+    env = MultiAgentEnv_algopricing(params, ["a", "b"], None, None, params["inventory_limit"],
+                                    params["inventory_replenish"], seed=seed, history="summary", headless=True)
+    env.sampler = CustomerSampler(covariates, valuations, env.rng)
+    return env
+
+
+def _episode_stats(rewards, sales):
+    # per-episode mean reward and sale rate of each agent: arrays [episodes, n_agents]
+    return rewards.mean(axis=1), sales.mean(axis=1)
+
+
+def _scalar_run(env):
+    random.seed(0)
+    n = len(PRICES)
+    rewards, sales = np.zeros((EPISODES, T, n)), np.zeros((EPISODES, T, n))
+    for e in range(EPISODES):
+        env.reset()
+        for t in range(T):
+            before = list(env.agent_profits)
+            (_, (winner, _), profits, _, _) = env.step(PRICES)
+            rewards[e, t] = np.subtract(profits, before)
+            if not np.isnan(winner):
+                sales[e, t, int(winner)] = 1
+    return _episode_stats(rewards, sales)
+
+
+def _vectorized_run(env):
+    venv = VectorizedMultiAgentEnv.from_env(env, EPISODES, seed=1)
+    n = len(PRICES)
+    rewards, sales = np.zeros((EPISODES, T, n)), np.zeros((EPISODES, T, n))
+    prices = np.tile(PRICES, (EPISODES, 1))
+    for t in range(T):
+        before = venv.agent_profits.copy()
+        (_, (winners, _), profits, _, _) = venv.step(prices)
+        rewards[:, t] = profits - before
+        sold = ~np.isnan(winners)
+        sales[np.flatnonzero(sold), t, winners[sold].astype(int)] = 1
+    return _episode_stats(rewards, sales)
+
+
+def test_vectorized_matches_scalar_at_fixed_prices():
+    env = _scalar_env()
+    scalar = _scalar_run(env)
+    vectorized = _vectorized_run(env)
+    for name, a, b in zip(("mean reward", "sale rate"), scalar, vectorized):
+        # episodes are independent draws: compare the means within 4 standard errors
+        se = np.sqrt(a.var(axis=0, ddof=1) / len(a) + b.var(axis=0, ddof=1) / len(b))
+        diff = np.abs(a.mean(axis=0) - b.mean(axis=0))
+        assert np.all(diff <= 4 * se), "{}: scalar {} vs vectorized {} (se {})".format(
+            name, a.mean(axis=0), b.mean(axis=0), se)
+        assert np.all(b.mean(axis=0) > 0)
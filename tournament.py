@@ -0,0 +1,208 @@
+"""
+Round-robin Part 2 tournament on top of make_env_2025.make_env_agents.
+
+Every pair of agents plays in both seat orders over several seeds. Matches are
+independent, so they are fanned out over a ProcessPoolExecutor with one worker
+per core, and the per-match revenues are gathered into a payoff matrix:
+
+    payoff[i, j] = mean revenue of agent i when playing against agent j
+
+together with the half-width of its 95% confidence interval.
+
+Match results are stored in a content-hash keyed cache (see match_cache.py),
+so a re-run only replays the pairings whose agents, models, data, params or
+seed changed.
+
+    python tournament.py dealmakers_pt2 alice david --seeds 5 --T 2500
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from agents.instrumentation import format_report
+from match_cache import MatchCache, match_key
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRST_FILE = os.path.join("data", "datafile1_2025.csv")
+SECOND_FILE = os.path.join("data", "datafile2_2025.csv")
+
+
+def schedule(agentnames, seeds, both_orders=True):
+    """
+    List of (seat0_name, seat1_name, seed) for every pair, seat order and seed.
+    """
+    matches = []
+    for a, b in itertools.combinations(agentnames, 2):
+        pairings = [(a, b), (b, a)] if both_orders else [(a, b)]
+        for seat0, seat1 in pairings:
+            for seed in seeds:
+                matches.append((seat0, seat1, seed))
+    return matches
+
+
+def _init_worker():
+    # agents open their model files relative to the repo root
+    os.chdir(REPO_DIR)
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+
+def play_match(seat0, seat1, seed, T, first_file=FIRST_FILE, second_file=SECOND_FILE, params=None):
+    """
+    Play one headless match and return {"agents", "seed", "revenues", "latency"},
+    where latency holds each seat's action() latency report.
+    """
+    import make_env_2025 as make_env
+
+    random.seed(seed)
+    np.random.seed(seed)
+    env, agents = make_env.make_env_agents(
+        [seat0, seat1], project_part=2, params=params,
+        first_file=first_file, second_file=second_file,
+        seed=seed, headless=True, history="summary", instrument=True
+    )
+    result = env.run_episode(agents, T, record=False)
+    return {
+        "agents": (seat0, seat1),
+        "seed": seed,
+        "revenues": tuple(float(r) for r in result["agent_profits"]),
+        "agent_time": tuple(float(t) for t in result["agent_time"]),
+        "latency": [agent.report() for agent in agents],
+    }
+
+
+def run_tournament(agentnames, seeds=range(5), T=2500, max_workers=None,
+                   first_file=FIRST_FILE, second_file=SECOND_FILE, params=None, verbose=False, cache=None):
+    """
+    Play every scheduled match on a process pool (one worker per core by default)
+    and return the list of match results. With a MatchCache, matches whose inputs
+    are unchanged are read back from the cache instead of being replayed.
+    """
+    from settings import default_params_2
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    matches = schedule(agentnames, list(seeds))
+    data_files = [os.path.join(REPO_DIR, first_file), os.path.join(REPO_DIR, second_file)]
+
+    results = []
+    pending = []
+    for seat0, seat1, seed in matches:
+        key = None
+        if cache is not None:
+            key = match_key(seat0, seat1, seed, T, params or default_params_2, data_files)
+            cached = cache.get(key)
+            if cached is not None:
+                results.append(cached)
+                continue
+        pending.append((key, (seat0, seat1, seed)))
+    if verbose and cache is not None:
+        print("{} of {} matches cached, playing {}".format(len(results), len(matches), len(pending)))
+    if not pending:
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(pending)), initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(play_match, seat0, seat1, seed, T, first_file, second_file, params): key
+            for key, (seat0, seat1, seed) in pending
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            if cache is not None:
+                cache.put(futures[future], result)
+            results.append(result)
+            if verbose:
+                print("{} vs {} (seed {}): {:.0f} / {:.0f}".format(
+                    result["agents"][0], result["agents"][1], result["seed"], *result["revenues"]))
+                for report in result["latency"]:
+                    print(format_report(report))
+    return results
+
+
+def payoff_matrix(results, agentnames, z=1.96):
+    """
+    Mean revenue of the row agent against the column agent over both seats and
+    all seeds, the CI half-width z * std / sqrt(n), and the number of samples.
+    """
+    index = {name: i for i, name in enumerate(agentnames)}
+    samples = [[[] for _ in agentnames] for _ in agentnames]
+    for result in results:
+        (a, b), (ra, rb) = result["agents"], result["revenues"]
+        samples[index[a]][index[b]].append(ra)
+        samples[index[b]][index[a]].append(rb)
+
+    n_agents = len(agentnames)
+    mean = np.full((n_agents, n_agents), np.nan)
+    ci = np.full((n_agents, n_agents), np.nan)
+    count = np.zeros((n_agents, n_agents), dtype=int)
+    for i in range(n_agents):
+        for j in range(n_agents):
+            values = np.asarray(samples[i][j])
+            count[i, j] = values.size
+            if values.size:
+                mean[i, j] = values.mean()
+                ci[i, j] = z * values.std(ddof=1) / np.sqrt(values.size) if values.size > 1 else np.nan
+    return mean, ci, count
+
+
+def format_payoff_matrix(agentnames, mean, ci):
+    width = max(12, max(len(name) for name in agentnames) + 2)
+    cell = "{:>" + str(max(20, width)) + "s}"
+    lines = [" " * width + "".join(cell.format(name) for name in agentnames)]
+    for i, name in enumerate(agentnames):
+        cells = []
+        for j in range(len(agentnames)):
+            if np.isnan(mean[i, j]):
+                cells.append(cell.format("-"))
+            else:
+                cells.append(cell.format("{:.0f} +/- {:.0f}".format(mean[i, j], np.nan_to_num(ci[i, j]))))
+        lines.append("{:<{w}s}".format(name, w=width) + "".join(cells))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin Part 2 tournament")
+    parser.add_argument("agents", nargs="+", help="agent file names under agents/, without .py")
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--T", type=int, default=2500)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--first_file", default=FIRST_FILE)
+    parser.add_argument("--second_file", default=SECOND_FILE)
+    parser.add_argument("--out", default=None, help="optional CSV for the payoff matrix")
+    parser.add_argument("--cache_dir", default=os.path.join(REPO_DIR, ".tournament_cache"))
+    parser.add_argument("--no_cache", action="store_true", help="replay every match")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else MatchCache(args.cache_dir)
+    results = run_tournament(
+        args.agents, range(args.seeds), args.T, args.workers,
+        os.path.abspath(args.first_file), os.path.abspath(args.second_file),
+        verbose=args.verbose, cache=cache
+    )
+    mean, ci, _ = payoff_matrix(results, args.agents)
+    print(format_payoff_matrix(args.agents, mean, ci))
+
+    violations = [
+        (report["name"], result["seed"], report["violations"])
+        for result in results for report in result.get("latency", []) if report["violations"]
+    ]
+    for name, seed, count in violations:
+        print("WARNING: {} exceeded the action budget {} times (seed {})".format(name, count, seed))
+
+    if args.out:
+        import pandas as pd
+        rows = []
+        for i, a in enumerate(args.agents):
+            for j, b in enumerate(args.agents):
+                rows.append({"agent": a, "opponent": b, "mean_revenue": mean[i, j], "ci95": ci[i, j]})
+        pd.DataFrame(rows).to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()